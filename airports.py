@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+GoWild Flight Finder - Airport Catalog
+One shared, read-only airport list with a fast autocomplete index
+"""
+
+import hashlib
+import json
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
+
+# Domestic US airports checked by discovery searches
+_DOMESTIC_AIRPORTS = (
+    'ATL', 'DEN', 'DFW', 'ORD', 'LAX', 'LAS', 'PHX', 'MIA', 'MCO', 'TPA', 'SFO', 'SEA',
+    'LGA', 'JFK', 'BOS', 'PHL', 'BWI', 'DCA', 'CLT', 'RDU', 'BUF', 'ISP', 'SYR', 'PWM',
+    'BTV', 'MDT', 'PIT', 'CLE', 'CVG', 'CMH', 'IND', 'DTW', 'MSP', 'MKE', 'GRB', 'MSN',
+    'GRR', 'ORF', 'RIC', 'CHS', 'SAV', 'JAX', 'PNS', 'SRQ', 'FLL', 'RSW', 'PBI',
+    'MYR', 'TTN', 'EWR', 'SJC', 'OAK', 'SAN', 'SMF', 'SNA', 'ONT', 'BUR', 'PSP',
+    'PDX', 'SLC', 'RNO', 'BOI', 'MSO', 'GEG', 'FAR', 'FSD', 'AUS', 'SAT', 'IAH', 'HOU',
+    'ELP', 'CRP', 'TUS', 'OKC', 'TUL', 'MCI', 'STL', 'MSY', 'MEM', 'BNA', 'TYS', 'LIT',
+    'XNA', 'DSM', 'CID', 'OMA'
+)
+
+# Airport names for display - comprehensive Frontier route list
+_AIRPORT_NAMES = {
+    # Major US Hubs
+    'ATL': 'Atlanta, GA', 'DEN': 'Denver, CO', 'DFW': 'Dallas, TX', 'ORD': 'Chicago, IL',
+    'LAX': 'Los Angeles, CA', 'LAS': 'Las Vegas, NV', 'PHX': 'Phoenix, AZ', 'MIA': 'Miami, FL',
+    'MCO': 'Orlando, FL', 'TPA': 'Tampa, FL', 'SFO': 'San Francisco, CA', 'SEA': 'Seattle, WA',
+
+    # East Coast
+    'LGA': 'LaGuardia, NY', 'JFK': 'JFK New York, NY', 'BOS': 'Boston, MA', 'PHL': 'Philadelphia, PA',
+    'BWI': 'Baltimore, MD', 'DCA': 'Washington DC', 'CLT': 'Charlotte, NC', 'RDU': 'Raleigh, NC',
+    'BUF': 'Buffalo, NY', 'ISP': 'Islip, NY', 'SYR': 'Syracuse, NY', 'PWM': 'Portland, ME',
+    'BTV': 'Burlington, VT', 'MDT': 'Harrisburg, PA', 'PIT': 'Pittsburgh, PA', 'CLE': 'Cleveland, OH',
+    'CVG': 'Cincinnati, OH', 'CMH': 'Columbus, OH', 'IND': 'Indianapolis, IN', 'DTW': 'Detroit, MI',
+    'MSP': 'Minneapolis, MN', 'MKE': 'Milwaukee, WI', 'GRB': 'Green Bay, WI', 'MSN': 'Madison, WI',
+    'GRR': 'Grand Rapids, MI', 'ORF': 'Norfolk, VA', 'RIC': 'Richmond, VA', 'CHS': 'Charleston, SC',
+    'SAV': 'Savannah, GA', 'JAX': 'Jacksonville, FL', 'PNS': 'Pensacola, FL', 'SRQ': 'Sarasota, FL',
+    'FLL': 'Fort Lauderdale, FL', 'RSW': 'Fort Myers, FL', 'PBI': 'West Palm Beach, FL',
+    'MYR': 'Myrtle Beach, SC', 'TTN': 'Trenton, NJ', 'EWR': 'Newark, NJ', 'HPN': 'White Plains, NY',
+
+    # West Coast  
+    'SJC': 'San Jose, CA', 'OAK': 'Oakland, CA', 'SAN': 'San Diego, CA', 'SMF': 'Sacramento, CA',
+    'SNA': 'Orange County, CA', 'ONT': 'Ontario, CA', 'BUR': 'Burbank, CA', 'PSP': 'Palm Springs, CA',
+    'PDX': 'Portland, OR', 'SLC': 'Salt Lake City, UT', 'RNO': 'Reno, NV', 'BOI': 'Boise, ID',
+    'MSO': 'Missoula, MT', 'GEG': 'Spokane, WA', 'FAR': 'Fargo, ND', 'FSD': 'Sioux Falls, SD',
+
+    # Central US
+    'AUS': 'Austin, TX', 'SAT': 'San Antonio, TX', 'IAH': 'Houston, TX', 'HOU': 'Houston Hobby, TX',
+    'ELP': 'El Paso, TX', 'CRP': 'Corpus Christi, TX', 'TUS': 'Tucson, AZ', 'OKC': 'Oklahoma City, OK',
+    'TUL': 'Tulsa, OK', 'MCI': 'Kansas City, MO', 'STL': 'St. Louis, MO', 'MSY': 'New Orleans, LA',
+    'MEM': 'Memphis, TN', 'BNA': 'Nashville, TN', 'TYS': 'Knoxville, TN', 'LIT': 'Little Rock, AR',
+    'XNA': 'Bentonville, AR', 'DSM': 'Des Moines, IA', 'CID': 'Cedar Rapids, IA', 'OMA': 'Omaha, NE',
+
+    # International/Caribbean
+    'CUN': 'Cancun, Mexico', 'PVR': 'Puerto Vallarta, Mexico', 'SJD': 'Los Cabos, Mexico',
+    'SJU': 'San Juan, Puerto Rico', 'BQN': 'Aguadilla, Puerto Rico', 'PSE': 'Ponce, Puerto Rico',
+    'STX': 'St. Croix, USVI', 'STT': 'St. Thomas, USVI', 'SXM': 'St. Maarten', 'ANU': 'Antigua',
+    'NAS': 'Nassau, Bahamas', 'MBJ': 'Montego Bay, Jamaica', 'KIN': 'Kingston, Jamaica',
+    'PUJ': 'Punta Cana, DR', 'SDQ': 'Santo Domingo, DR', 'STI': 'Santiago, DR', 'POP': 'Puerto Plata, DR',
+    'SAL': 'San Salvador, El Salvador', 'GUA': 'Guatemala City', 'SJO': 'San Jose, Costa Rica',
+    'SAP': 'San Pedro Sula, Honduras', 'BGI': 'Bridgetown, Barbados', 'POS': 'Port of Spain, Trinidad',
+    'AUA': 'Aruba', 'PLS': 'Providenciales, Turks & Caicos'
+}
+
+# Public, immutable views shared by the CLI checker and the web app
+DOMESTIC_AIRPORTS = _DOMESTIC_AIRPORTS
+AIRPORT_NAMES = MappingProxyType(_AIRPORT_NAMES)
+
+
+def _normalize(text):
+    return re.sub(r'[^a-z0-9 ]+', ' ', text.lower()).strip()
+
+
+def _trigrams(text):
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class AirportIndex:
+    """Prefix and fuzzy (trigram) index over airport codes and city names
+
+    Built once at import. Prefix lookups are a binary search over sorted
+    terms; queries with too few prefix hits fall back to trigram similarity
+    so typos like "denvr" or "las vegs" still find their airport.
+    """
+
+    def __init__(self, names, min_similarity=0.6):
+        self.names = names
+        self.min_similarity = min_similarity
+
+        # (term, code) for the code, the full name and every word of the name
+        terms = set()
+        for code, name in names.items():
+            normalized = _normalize(name)
+            terms.add((code.lower(), code))
+            terms.add((normalized, code))
+            for word in normalized.split():
+                terms.add((word, code))
+        self._terms = sorted(terms)
+        self._keys = [term for term, _ in self._terms]
+
+        # Trigrams per word, so every word contributes its own start-of-word grams
+        self._grams = {code: _trigrams(f"{code.lower()} {_normalize(name)}") for code, name in names.items()}
+        self._gram_index = defaultdict(set)
+        for code, grams in self._grams.items():
+            for gram in grams:
+                self._gram_index[gram].add(code)
+
+    def entry(self, code):
+        return {'code': code, 'name': self.names[code]}
+
+    def search(self, query, limit=10):
+        """Best matching airports for a query, as [{'code', 'name'}, ...]"""
+        return [self.entry(code) for code in self._search(_normalize(query), limit)]
+
+    @lru_cache(maxsize=4096)
+    def _search(self, query, limit):
+        if not query:
+            return tuple(list(self.names)[:limit])
+
+        ranked = []
+        seen = set()
+
+        def add(code):
+            if code not in seen:
+                seen.add(code)
+                ranked.append(code)
+
+        # Exact code first, then every term starting with the query
+        if query.upper() in self.names:
+            add(query.upper())
+        start = bisect_left(self._keys, query)
+        for term, code in self._terms[start:]:
+            if not term.startswith(query):
+                break
+            add(code)
+
+        # Short queries with prefix hits are already precise - don't pad them with noise
+        if len(ranked) < limit and (not ranked or len(query) >= 4):
+            grams = _trigrams(query)
+            candidates = set()
+            for gram in grams:
+                candidates |= self._gram_index.get(gram, set())
+            scored = []
+            for code in candidates - seen:
+                # Share of the query's trigrams found in the airport, so short
+                # queries aren't penalized against long names
+                shared = len(grams & self._grams[code])
+                similarity = shared / len(grams)
+                if similarity >= self.min_similarity:
+                    scored.append((-similarity, -shared / len(self._grams[code]), code))
+            for _, _, code in sorted(scored):
+                add(code)
+
+        return tuple(ranked[:limit])
+
+
+CATALOG = AirportIndex(AIRPORT_NAMES)
+
+# Serialized catalog for the browser, versioned by content so it can be cached forever
+CATALOG_JSON = json.dumps(
+    [{'code': code, 'name': name, 'domestic': code in DOMESTIC_AIRPORTS} for code, name in AIRPORT_NAMES.items()],
+    separators=(',', ':')
+).encode('utf-8')
+CATALOG_VERSION = hashlib.sha1(CATALOG_JSON).hexdigest()[:12]
+
+
+def search_airports(query, limit=10):
+    """Autocomplete helper over the shared catalog"""
+    return CATALOG.search(query, limit)
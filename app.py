@@ -4,20 +4,65 @@ GoWild Flight Finder Web Application
 Beautiful web interface for finding Frontier GoWild flights
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, send_from_directory, url_for
 import json
+import gzip
+import hashlib
+import os
+import sys
+import atexit
+import signal
 import requests
 import html
-import random
 import time
+import uuid
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 import re
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 import threading
+from snapshot import Snapshot, write_snapshot
+from profiling import ProfileSession, span, format_summary
+import exporters
+from exporters import EXPORTERS, ParquetExporter, ChunkSink
+from scheduler import FairScheduler, QuotaExceeded
+from limiter import AdaptiveLimiter
+from subscriptions import SubscriptionStore, DEFAULT_PATH as SUBSCRIPTIONS_PATH
+from rollups import RouteRollups
+from airports import AIRPORT_NAMES, DOMESTIC_AIRPORTS, CATALOG_JSON, CATALOG_VERSION, search_airports
+
+try:
+    import brotli  # optional - enables Content-Encoding: br
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 
+# Max routes a single discovery search will check (keeps load on Frontier reasonable)
+DISCOVERY_LIMIT = 20
+
+# Routes an export keeps queued upstream at once
+EXPORT_WINDOW = 10
+
+# Responses smaller than this aren't worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+# Warm-start snapshot of cached route answers, rewritten periodically and on shutdown
+SNAPSHOT_PATH = os.environ.get('GOWILD_SNAPSHOT_PATH',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gowild_snapshot.bin'))
+SNAPSHOT_INTERVAL = 60  # seconds
+
+# Reverse proxies allowed to name the end client via X-Client-Id (comma separated addresses)
+TRUSTED_PROXIES = {address.strip() for address in os.environ.get('GOWILD_TRUSTED_PROXIES', '').split(',') if address.strip()}
+
+# Hard bounds for the adaptive upstream limiter; it finds the pace within them
+UPSTREAM_MAX_IN_FLIGHT = int(os.environ.get('GOWILD_UPSTREAM_MAX_IN_FLIGHT', 8))
+UPSTREAM_MIN_INTERVAL = float(os.environ.get('GOWILD_UPSTREAM_MIN_INTERVAL', 0.2))  # seconds between request starts
+
+# Where opt-in search profiles (?profile=1 or X-GoWild-Profile: 1) are written
+PROFILE_DIR = os.environ.get('GOWILD_PROFILE_DIR',
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+
 class GoWildAPI:
     def __init__(self):
         self.session = requests.Session()
@@ -29,75 +74,184 @@ class GoWildAPI:
             "Connection": "keep-alive"
         })
         
-        # Airport data
-        self.domestic_airports = [
-            'ATL', 'DEN', 'DFW', 'ORD', 'LAX', 'LAS', 'PHX', 'MIA', 'MCO', 'TPA', 'SFO', 'SEA',
-            'LGA', 'JFK', 'BOS', 'PHL', 'BWI', 'DCA', 'CLT', 'RDU', 'BUF', 'ISP', 'SYR', 'PWM',
-            'BTV', 'MDT', 'PIT', 'CLE', 'CVG', 'CMH', 'IND', 'DTW', 'MSP', 'MKE', 'GRB', 'MSN',
-            'GRR', 'ORF', 'RIC', 'CHS', 'SAV', 'JAX', 'PNS', 'SRQ', 'FLL', 'RSW', 'PBI',
-            'MYR', 'TTN', 'EWR', 'SJC', 'OAK', 'SAN', 'SMF', 'SNA', 'ONT', 'BUR', 'PSP',
-            'PDX', 'SLC', 'RNO', 'BOI', 'MSO', 'GEG', 'FAR', 'FSD', 'AUS', 'SAT', 'IAH', 'HOU',
-            'ELP', 'CRP', 'TUS', 'OKC', 'TUL', 'MCI', 'STL', 'MSY', 'MEM', 'BNA', 'TYS', 'LIT',
-            'XNA', 'DSM', 'CID', 'OMA'
-        ]
+        # Shared, read-only airport catalog (see airports.py)
+        self.domestic_airports = DOMESTIC_AIRPORTS
+        self.airport_names = AIRPORT_NAMES
         
-        self.airport_names = {
-            # Major US Hubs
-            'ATL': 'Atlanta, GA', 'DEN': 'Denver, CO', 'DFW': 'Dallas, TX', 'ORD': 'Chicago, IL',
-            'LAX': 'Los Angeles, CA', 'LAS': 'Las Vegas, NV', 'PHX': 'Phoenix, AZ', 'MIA': 'Miami, FL',
-            'MCO': 'Orlando, FL', 'TPA': 'Tampa, FL', 'SFO': 'San Francisco, CA', 'SEA': 'Seattle, WA',
-            
-            # East Coast
-            'LGA': 'LaGuardia, NY', 'JFK': 'JFK New York, NY', 'BOS': 'Boston, MA', 'PHL': 'Philadelphia, PA',
-            'BWI': 'Baltimore, MD', 'DCA': 'Washington DC', 'CLT': 'Charlotte, NC', 'RDU': 'Raleigh, NC',
-            'BUF': 'Buffalo, NY', 'ISP': 'Islip, NY', 'SYR': 'Syracuse, NY', 'PWM': 'Portland, ME',
-            'BTV': 'Burlington, VT', 'MDT': 'Harrisburg, PA', 'PIT': 'Pittsburgh, PA', 'CLE': 'Cleveland, OH',
-            'CVG': 'Cincinnati, OH', 'CMH': 'Columbus, OH', 'IND': 'Indianapolis, IN', 'DTW': 'Detroit, MI',
-            'MSP': 'Minneapolis, MN', 'MKE': 'Milwaukee, WI', 'GRB': 'Green Bay, WI', 'MSN': 'Madison, WI',
-            'GRR': 'Grand Rapids, MI', 'ORF': 'Norfolk, VA', 'RIC': 'Richmond, VA', 'CHS': 'Charleston, SC',
-            'SAV': 'Savannah, GA', 'JAX': 'Jacksonville, FL', 'PNS': 'Pensacola, FL', 'SRQ': 'Sarasota, FL',
-            'FLL': 'Fort Lauderdale, FL', 'RSW': 'Fort Myers, FL', 'PBI': 'West Palm Beach, FL',
-            'MYR': 'Myrtle Beach, SC', 'TTN': 'Trenton, NJ', 'EWR': 'Newark, NJ',
-            
-            # West Coast  
-            'SJC': 'San Jose, CA', 'OAK': 'Oakland, CA', 'SAN': 'San Diego, CA', 'SMF': 'Sacramento, CA',
-            'SNA': 'Orange County, CA', 'ONT': 'Ontario, CA', 'BUR': 'Burbank, CA', 'PSP': 'Palm Springs, CA',
-            'PDX': 'Portland, OR', 'SLC': 'Salt Lake City, UT', 'RNO': 'Reno, NV', 'BOI': 'Boise, ID',
-            'MSO': 'Missoula, MT', 'GEG': 'Spokane, WA', 'FAR': 'Fargo, ND', 'FSD': 'Sioux Falls, SD',
-            
-            # Central US
-            'AUS': 'Austin, TX', 'SAT': 'San Antonio, TX', 'IAH': 'Houston, TX', 'HOU': 'Houston Hobby, TX',
-            'ELP': 'El Paso, TX', 'CRP': 'Corpus Christi, TX', 'TUS': 'Tucson, AZ', 'OKC': 'Oklahoma City, OK',
-            'TUL': 'Tulsa, OK', 'MCI': 'Kansas City, MO', 'STL': 'St. Louis, MO', 'MSY': 'New Orleans, LA',
-            'MEM': 'Memphis, TN', 'BNA': 'Nashville, TN', 'TYS': 'Knoxville, TN', 'LIT': 'Little Rock, AR',
-            'XNA': 'Bentonville, AR', 'DSM': 'Des Moines, IA', 'CID': 'Cedar Rapids, IA', 'OMA': 'Omaha, NE',
-        }
+        # Route answers shared by every search, keyed by (origin, destination, date).
+        # Outbound and inbound discovery look up the same keys, so either one
+        # answers the other's overlapping routes without another upstream fetch.
+        self.route_cache = {}
+        self.cache_lock = threading.Lock()
+        self.cache_ttl = 15 * 60  # seconds
+        self.cache_version = 0  # bumped on every write so snapshots can skip idle periods
+        
+        # Memory-mapped answers from the previous run, consulted on cache misses
+        self.snapshot = None
+        
+        # Callables(origin, destination, date_str, flights) run on every freshly parsed route
+        self.observers = []
+        
+        # Callables(origin, destination, date_str, flights, fetched_at) run when a cached
+        # or snapshot answer is served instead, so derived views don't need a refetch
+        self.cache_observers = []
+        
+        # Concurrency and pacing for upstream requests, adapted from their latency and errors
+        # (starts where the old fixed 5 workers x 1-2s sleep left off)
+        self.limiter = AdaptiveLimiter('Upstream', max_limit=UPSTREAM_MAX_IN_FLIGHT, min_interval=UPSTREAM_MIN_INTERVAL,
+                                       initial_limit=5, initial_interval=0.3)
 
-    def check_flight(self, origin, destination, date):
-        """Check a single route for GoWild flights"""
-        try:
-            # Format date for URL
-            date_str = date.strftime("%b-%d,-%Y").replace("-", "%20")
-            
-            # Build URL
-            url = f"https://booking.flyfrontier.com/Flight/InternalSelect?o1={origin}&d1={destination}&dd1={date_str}&ADT=1&mon=true&promo="
-            
-            # Add delay to be respectful
-            time.sleep(random.uniform(1, 2))
-            
-            # Make request
-            response = self.session.get(url, timeout=30)
+    def check_flight(self, origin, destination, date, timeline=None, ticket=None):
+        """Check a single route for GoWild flights
+        
+        ticket is a limiter ticket already taken for this fetch (the scheduler
+        takes one before picking the task); without one, wait for the limiter here.
+        """
+        with span(timeline, f"{origin}→{destination}", 'route', origin=origin, destination=destination) as route:
+            cached = self.get_cached_flights(origin, destination, date)
+            if cached is not None:
+                if ticket is not None:
+                    ticket.cancel()
+                route.update(cached=True, flights=len(cached))
+                return cached
             
-            if response.status_code != 200:
+            try:
+                # Format date for URL
+                date_str = date.strftime("%b-%d,-%Y").replace("-", "%20")
+                
+                # Build URL
+                url = f"https://booking.flyfrontier.com/Flight/InternalSelect?o1={origin}&d1={destination}&dd1={date_str}&ADT=1&mon=true&promo="
+                
+                # Wait for the limiter's current pace to be respectful
+                if ticket is None:
+                    with span(timeline, 'sleep', 'sleep'):
+                        ticket = self.limiter.acquire()
+                
+                # Make request
+                with ticket, span(timeline, 'fetch', 'fetch') as fetch:
+                    response = self.session.get(url, timeout=30)
+                    ticket.record(response)
+                    fetch.update(status=response.status_code, bytes=len(response.content))
+                route.update(status=response.status_code, bytes=len(response.content))
+                
+                if response.status_code != 200:
+                    return []
+                
+                # Extract flight data
+                with span(timeline, 'parse', 'parse'):
+                    flights = self._extract_gowild_flights(response)
+                route.update(flights=len(flights))
+                self._cache_flights(origin, destination, date, flights)
+                self._notify_observers(origin, destination, date, flights)
+                return flights
+                
+            except Exception as e:
+                print(f"Error checking {origin} to {destination}: {e}")
+                route.update(error=str(e))
                 return []
-            
-            # Extract flight data
-            flights = self._extract_gowild_flights(response)
-            return flights
-            
-        except Exception as e:
-            print(f"Error checking {origin} to {destination}: {e}")
-            return []
+
+    def get_cached_flights(self, origin, destination, date):
+        """Return a fresh cached answer for a route/date, or None"""
+        key = (origin, destination, date.strftime('%Y-%m-%d'))
+        with self.cache_lock:
+            entry = self.route_cache.get(key)
+            if entry is None:
+                entry = self._load_from_snapshot(key)
+                if entry is None:
+                    return None
+            fetched_at, flights = entry
+            if time.time() - fetched_at > self.cache_ttl:
+                self.route_cache.pop(key, None)
+                return None
+        
+        for observer in self.cache_observers:
+            try:
+                observer(*key, flights, fetched_at)
+            except Exception as e:
+                print(f"Cache observer error for {origin} to {destination}: {e}")
+        return flights
+
+    def _load_from_snapshot(self, key):
+        """Promote a snapshot record into the in-memory cache (caller holds cache_lock)"""
+        if self.snapshot is None:
+            return None
+        record = self.snapshot.get('routes', '|'.join(key))
+        if record is None:
+            return None
+        entry = (record[0], record[1])
+        self.route_cache[key] = entry
+        return entry
+
+    def _cache_flights(self, origin, destination, date, flights):
+        """Remember a successful route answer, including empty ones"""
+        key = (origin, destination, date.strftime('%Y-%m-%d'))
+        with self.cache_lock:
+            self.route_cache[key] = (time.time(), flights)
+            self.cache_version += 1
+
+    def _notify_observers(self, origin, destination, date, flights):
+        """Hand a freshly parsed route to every observer (subscriptions, ...)"""
+        date_str = date.strftime('%Y-%m-%d')
+        for observer in self.observers:
+            try:
+                observer(origin, destination, date_str, flights)
+            except Exception as e:
+                print(f"Observer error for {origin} to {destination}: {e}")
+
+    def _snapshot_fetched_at(self, snapshot_key):
+        """When a snapshot record was fetched - from the header index when stamped there"""
+        fetched_at = self.snapshot.stamp('routes', snapshot_key)
+        if fetched_at is None:
+            fetched_at = self.snapshot.get('routes', snapshot_key)[0]  # snapshots written before stamps
+        return fetched_at
+
+    def snapshot_sections(self):
+        """Collect unexpired cache entries for the warm-start snapshot
+        
+        Returns (sections, stamps) for write_snapshot; each route is stamped
+        with its fetch time so the next run can skip expired ones unread.
+        """
+        now = time.time()
+        routes = {}
+        fetched = {}
+        with self.cache_lock:
+            for key, (fetched_at, flights) in self.route_cache.items():
+                if now - fetched_at <= self.cache_ttl:
+                    routes['|'.join(key)] = [fetched_at, flights]
+                    fetched['|'.join(key)] = fetched_at
+        
+        # Carry over snapshot records that were never looked up this run,
+        # copying their bytes through without re-encoding
+        if self.snapshot is not None:
+            for snapshot_key in self.snapshot.keys('routes'):
+                if snapshot_key in routes:
+                    continue
+                fetched_at = self._snapshot_fetched_at(snapshot_key)
+                if now - fetched_at <= self.cache_ttl:
+                    routes[snapshot_key] = self.snapshot.raw('routes', snapshot_key)
+                    fetched[snapshot_key] = fetched_at
+        
+        return {'routes': routes}, {'routes': fetched}
+
+    def replay_snapshot(self, observer):
+        """Hand every unexpired snapshot record to observer(origin, destination, date_str, flights, fetched_at)
+        
+        Decodes every record it hands over, so run it off the request path.
+        """
+        if self.snapshot is None:
+            return 0
+        now = time.time()
+        replayed = 0
+        for snapshot_key in self.snapshot.keys('routes'):
+            if now - self._snapshot_fetched_at(snapshot_key) > self.cache_ttl:
+                continue
+            fetched_at, flights = self.snapshot.get('routes', snapshot_key)
+            try:
+                observer(*snapshot_key.split('|'), flights, fetched_at)
+            except Exception as e:
+                print(f"Snapshot replay error for {snapshot_key}: {e}")
+            replayed += 1
+        return replayed
 
     def _extract_gowild_flights(self, response):
         """Extract GoWild flights from response"""
@@ -237,135 +391,596 @@ class GoWildAPI:
         except:
             return "Unknown"
 
-# Create API instance
+# Create API instance and warm it from the last snapshot (header only - records load on demand)
 api = GoWildAPI()
+api.snapshot = Snapshot(SNAPSHOT_PATH)
+
+# All upstream fetches share one worker per possible in-flight request, fairly
+# split between clients; a worker picks its task only once the adaptive limiter
+# admits a request, so priority order holds all the way to upstream
+scheduler = FairScheduler(workers=UPSTREAM_MAX_IN_FLIGHT, limiter=api.limiter)
+
+# Saved searches, matched against every route any fetch parses
+subscriptions = SubscriptionStore(SUBSCRIPTIONS_PATH)
+api.observers.append(subscriptions.observe)
+
+# Per-airport/date discovery summaries, kept current as routes are fetched or
+# served from cache, and seeded from the snapshot; they age out with the cache
+rollups = RouteRollups(ttl=api.cache_ttl)
+api.observers.append(rollups.observe)
+api.cache_observers.append(rollups.observe)
+# Seeding decodes every snapshot record, so it happens in the background
+# rather than holding up startup (summaries fill in within moments)
+threading.Thread(target=api.replay_snapshot, args=(rollups.observe,), name='rollup-seed', daemon=True).start()
+started_at = time.time()
+
+def save_snapshot():
+    """Write the current cache to the warm-start snapshot"""
+    try:
+        sections, stamps = api.snapshot_sections()
+        write_snapshot(SNAPSHOT_PATH, sections, time.time(), stamps)
+    except OSError as e:
+        print(f"⚠️  Could not write snapshot {SNAPSHOT_PATH}: {e}")
+
+def start_snapshot_writer():
+    """Snapshot the cache periodically and once more on shutdown
+    
+    Only writes after this process changed the cache, so a process that never
+    serves (the debug reloader's watcher) can't overwrite the serving
+    process's snapshot with the stale one it loaded at startup.
+    """
+    lock = threading.Lock()
+    saved_version = [api.cache_version]
+    
+    def save_if_changed():
+        with lock:
+            version = api.cache_version
+            if version != saved_version[0]:
+                saved_version[0] = version
+                save_snapshot()
+    
+    def writer_loop():
+        while True:
+            time.sleep(SNAPSHOT_INTERVAL)
+            save_if_changed()
+    
+    threading.Thread(target=writer_loop, name='snapshot-writer', daemon=True).start()
+    atexit.register(save_if_changed)
+    # Turn SIGTERM (deploys, process managers) into a normal exit so atexit runs,
+    # unless the server running us (gunicorn, ...) already handles it
+    if (threading.current_thread() is threading.main_thread()
+            and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL):
+        def exit_on_sigterm(signum, frame):
+            # A repeated SIGTERM (e.g. forwarded by a wrapper) must not cut the final save short
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            sys.exit(0)
+        signal.signal(signal.SIGTERM, exit_on_sigterm)
+
+# Started with the app, so app.run, flask run and WSGI servers all persist the cache
+start_snapshot_writer()
+
+@app.route('/healthz')
+def healthz():
+    """Readiness probe - answers as soon as the app can serve searches"""
+    with api.cache_lock:
+        cached_routes = len(api.route_cache)
+    return jsonify({
+        'status': 'ok',
+        'uptime_seconds': round(time.time() - started_at, 3),
+        'cached_routes': cached_routes,
+        'snapshot_routes': len(api.snapshot) if api.snapshot is not None else 0,
+        'snapshot_created': api.snapshot.created if api.snapshot is not None else None
+    })
 
 @app.route('/')
 def index():
     """Main page"""
-    return render_template('index.html', airports=api.airport_names)
+    return render_template('index.html', catalog_url=url_for('airport_catalog', v=CATALOG_VERSION))
+
+@app.route('/airports.json')
+def airport_catalog():
+    """Full airport catalog - content-versioned via ?v= so browsers cache it for good"""
+    response = Response(CATALOG_JSON, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['ETag'] = f'"{CATALOG_VERSION}"'
+    return response
+
+@app.route('/api/airports')
+def autocomplete_airports():
+    """Airport autocomplete over codes and city names (prefix, then fuzzy)"""
+    query = request.args.get('q', '')
+    # Typed queries get a short ranked list; the empty query browses the whole catalog
+    most = 100 if query.strip() else len(AIRPORT_NAMES)
+    limit = max(1, min(request.args.get('limit', 10, type=int), most))
+    response = jsonify({'results': search_airports(query, limit)})
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
+
+def dedupe_flights(flights):
+    """Remove duplicate flights while keeping the original order"""
+    unique_flights = []
+    seen_flights = set()
+    
+    for flight in flights:
+        # Create a unique identifier for each flight
+        flight_id = (
+            flight.get('flight_number', ''),
+            flight.get('departure_time', ''),
+            flight.get('arrival_time', ''),
+            flight.get('departure_airport', ''),
+            flight.get('arrival_airport', ''),
+            flight.get('price', 0)
+        )
+        
+        if flight_id not in seen_flights:
+            seen_flights.add(flight_id)
+            unique_flights.append(flight)
+    
+    return unique_flights
+
+def limit_discovery_routes(routes_to_check, flight_date):
+    """Apply DISCOVERY_LIMIT to a fan of routes
+    
+    Routes past the limit are still included when already answered (e.g. by an
+    earlier discovery in the other direction) since they cost nothing upstream.
+    """
+    return routes_to_check[:DISCOVERY_LIMIT] + [
+        route for route in routes_to_check[DISCOVERY_LIMIT:]
+        if api.get_cached_flights(route[0], route[1], flight_date) is not None
+    ]
+
+def client_id():
+    """Identify the caller for fair scheduling and quotas
+    
+    Keyed on the remote address. X-Client-Id is only honoured from a proxy
+    listed in GOWILD_TRUSTED_PROXIES, since anyone else could send a fresh id
+    per request to dodge their quota, or someone else's to use it up.
+    """
+    remote = request.remote_addr or 'local'
+    if remote in TRUSTED_PROXIES:
+        return request.headers.get('X-Client-Id') or remote
+    return remote
+
+def schedule_routes(client, traffic_class, routes, timeline=None):
+    """Fetch [(origin, destination, date), ...] through the fair scheduler
+    
+    Returns one Future per route, in order. Cache hits resolve immediately and
+    never take a place in the upstream queue.
+    """
+    futures = [None] * len(routes)
+    calls = []
+    positions = []
+    for i, (origin, destination, flight_date) in enumerate(routes):
+        cached = api.get_cached_flights(origin, destination, flight_date)
+        if cached is not None:
+            # Still a route of this search as far as the profile is concerned
+            with span(timeline, f"{origin}→{destination}", 'route', origin=origin, destination=destination,
+                      cached=True, flights=len(cached)):
+                pass
+            futures[i] = Future()
+            futures[i].set_result(cached)
+        else:
+            calls.append((api.check_flight, (origin, destination, flight_date, timeline)))
+            positions.append(i)
+    
+    if calls:
+        for i, future in zip(positions, scheduler.submit_batch(client, traffic_class, calls)):
+            futures[i] = future
+    return futures
+
+def discover_routes(routes_to_check, flight_date, group_by, client, timeline=None):
+    """Check many routes in parallel and group flights by the fanned-out airport
+    
+    group_by is 'destination' for outbound discovery (one origin to everywhere)
+    and 'origin' for inbound discovery (everywhere to one destination).
+    """
+    airport_key = 'arrival_airport' if group_by == 'destination' else 'departure_airport'
+    
+    routes = limit_discovery_routes(routes_to_check, flight_date)
+    
+    # Discovery is bulk work - interactive searches from anyone are served first
+    futures = schedule_routes(client, 'bulk', [(origin, dest, flight_date) for origin, dest in routes], timeline)
+    
+    # Group flights by actual airport to avoid mixing different airports
+    groups = {}
+    
+    for (origin, dest), future in zip(routes, futures):
+        flights = future.result()
+        if flights:
+            # Use the ACTUAL airport from flight data, not the requested one
+            requested = dest if group_by == 'destination' else origin
+            actual = flights[0].get(airport_key, requested)
+            if actual not in groups:
+                groups[actual] = {
+                    group_by: actual,
+                    f'{group_by}_name': api.airport_names.get(actual, actual),
+                    'flights': []
+                }
+            groups[actual]['flights'].extend(flights)
+    
+    # Remove duplicate flights within each group
+    for group in groups.values():
+        group['flights'] = dedupe_flights(group['flights'])
+    
+    return list(groups.values())
+
+def encode_compact(payload):
+    """Convert a search payload to the compact columnar wire format
+    
+    Every repeated string (airport codes and names, times, durations, stops
+    text, flight numbers) is stored once in a shared string table and referenced
+    by index. Flights from all groups are laid out column by column; each group
+    points at its slice with an offset and count. Layovers are flattened per
+    flight as [airport, duration, airport, duration, ...] string indexes.
+    """
+    strings = []
+    string_ids = {}
+    
+    def sid(value):
+        if value is None:
+            return -1
+        value = str(value)
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+    
+    columns = {
+        'stops': [], 'price': [], 'departure_time': [], 'departure_airport': [],
+        'arrival_time': [], 'arrival_airport': [], 'duration': [], 'seats': [],
+        'flight_number': [], 'layovers': []
+    }
+    string_columns = ('stops', 'departure_time', 'departure_airport', 'arrival_time',
+                      'arrival_airport', 'duration', 'flight_number')
+    
+    group_key = 'origin' if payload.get('direction') == 'inbound' else 'destination'
+    groups = []
+    for result in payload['results']:
+        groups.append([
+            sid(result[group_key]),
+            sid(result[f'{group_key}_name']),
+            len(columns['price']),
+            len(result['flights'])
+        ])
+        for flight in result['flights']:
+            for column in string_columns:
+                columns[column].append(sid(flight.get(column)))
+            columns['price'].append(flight.get('price', 0))
+            columns['seats'].append(flight.get('seats'))
+            layovers = []
+            for layover in flight.get('layovers', []):
+                layovers.extend([sid(layover['airport']), sid(layover['duration'])])
+            columns['layovers'].append(layovers)
+    
+    compact = {key: value for key, value in payload.items() if key != 'results'}
+    compact.update({
+        'format': 'compact',
+        'version': 1,
+        'group_key': group_key,
+        'strings': strings,
+        'groups': groups,  # [airport, name, offset, count]
+        'columns': columns
+    })
+    return compact
+
+def make_search_response(payload, compact=False):
+    """Serialize a search payload with ETag revalidation and compression"""
+    if compact:
+        payload = encode_compact(payload)
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    
+    # Weak validator: it identifies the JSON, not the gzip/br/identity bytes on the wire
+    digest = hashlib.sha1(body).hexdigest()
+    headers = {
+        'ETag': f'W/"{digest}"',
+        'Cache-Control': 'private, no-cache',
+        'Vary': 'Accept-Encoding'
+    }
+    
+    # Client already has this exact result - skip the body entirely.
+    # If-None-Match uses weak comparison (RFC 9110), so W/"x", "x" and * all match
+    if request.if_none_match.contains_weak(digest):
+        return Response(status=304, headers=headers)
+    
+    # Quality-aware, so 'br;q=0' means no brotli
+    accepted = request.accept_encodings
+    if len(body) >= COMPRESS_MIN_BYTES:
+        if brotli is not None and accepted['br']:
+            body = brotli.compress(body, quality=5)
+            headers['Content-Encoding'] = 'br'
+        elif accepted['gzip']:
+            body = gzip.compress(body, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+    
+    return Response(body, mimetype='application/json', headers=headers)
+
+def run_search(data, client, timeline=None):
+    """Run a search request body and return the response payload"""
+    origin = data.get('origin', '').upper()
+    destinations = data.get('destinations', [])
+    date_str = data.get('date')
+    search_type = data.get('searchType', 'specific')
+    
+    # Parse date
+    flight_date = datetime.strptime(date_str, '%Y-%m-%d')
+    
+    results = []
+    
+    if search_type == 'all_domestic_inbound':
+        # Reverse discovery - search all domestic airports into one destination
+        destination = (data.get('destination') or '').upper()
+        if not destination:
+            raise ValueError("destination is required for all_domestic_inbound searches")
+        routes_to_check = [(airport, destination) for airport in api.domestic_airports if airport != destination]
+        results = discover_routes(routes_to_check, flight_date, 'origin', client, timeline)
+        
+        return {
+            'success': True,
+            'direction': 'inbound',
+            'results': results,
+            'destination': destination,
+            'destination_name': api.airport_names.get(destination, destination),
+            'date': flight_date.strftime('%A, %B %d, %Y')
+        }
+    
+    if search_type == 'all_domestic':
+        # Discovery mode - search all domestic airports
+        routes_to_check = [(origin, airport) for airport in api.domestic_airports if airport != origin]
+        results = discover_routes(routes_to_check, flight_date, 'destination', client, timeline)
+    else:
+        # Specific destinations - interactive, so they jump ahead of queued discovery work
+        wanted = []
+        for dest in destinations:
+            dest = dest.upper()
+            if dest != origin and dest not in wanted:
+                wanted.append(dest)
+        
+        futures = schedule_routes(client, 'interactive', [(origin, dest, flight_date) for dest in wanted], timeline)
+        for dest, future in zip(wanted, futures):
+            flights = future.result()
+            if flights:
+                # Remove duplicates for specific searches too
+                results.append({
+                    'destination': dest,
+                    'destination_name': api.airport_names.get(dest, dest),
+                    'flights': dedupe_flights(flights)
+                })
+    
+    return {
+        'success': True,
+        'direction': 'outbound',
+        'results': results,
+        'origin': origin,
+        'origin_name': api.airport_names.get(origin, origin),
+        'date': flight_date.strftime('%A, %B %d, %Y')
+    }
 
 @app.route('/api/search', methods=['POST'])
 def search_flights():
     """Search for flights API endpoint"""
     try:
         data = request.json
-        origin = data.get('origin', '').upper()
-        destinations = data.get('destinations', [])
-        date_str = data.get('date')
-        search_type = data.get('searchType', 'specific')
+        compact = request.args.get('format') == 'compact'
+        profile = request.args.get('profile') == '1' or request.headers.get('X-GoWild-Profile') == '1'
         
-        # Parse date
-        flight_date = datetime.strptime(date_str, '%Y-%m-%d')
+        client = client_id()
         
-        results = []
+        if not profile:
+            return make_search_response(run_search(data, client), compact)
         
-        if search_type == 'all_domestic':
-            # Discovery mode - search all domestic airports
-            destinations_to_check = [airport for airport in api.domestic_airports if airport != origin]
-            
-            # Use threading for faster searches (but still respectful)
-            def check_destination(dest):
-                flights = api.check_flight(origin, dest, flight_date)
-                if flights:
-                    # Use the ACTUAL destination from flight data, not the requested one
-                    actual_dest = flights[0].get('arrival_airport', dest) if flights else dest
-                    return {
-                        'destination': actual_dest,
-                        'destination_name': api.airport_names.get(actual_dest, actual_dest),
-                        'flights': flights
-                    }
-                return None
-            
-            # Check up to 10 destinations in parallel to speed up discovery
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = [executor.submit(check_destination, dest) for dest in destinations_to_check[:20]]  # Limit for demo
-                
-                # Group flights by actual destination to avoid mixing different airports
-                destination_groups = {}
-                
-                for future in futures:
-                    result = future.result()
-                    if result:
-                        actual_dest = result['destination']
-                        if actual_dest not in destination_groups:
-                            destination_groups[actual_dest] = {
-                                'destination': actual_dest,
-                                'destination_name': result['destination_name'],
-                                'flights': []
-                            }
-                        destination_groups[actual_dest]['flights'].extend(result['flights'])
-                
-                # Remove duplicate flights within each destination group
-                for dest_group in destination_groups.values():
-                    unique_flights = []
-                    seen_flights = set()
-                    
-                    for flight in dest_group['flights']:
-                        # Create a unique identifier for each flight
-                        flight_id = (
-                            flight.get('flight_number', ''),
-                            flight.get('departure_time', ''),
-                            flight.get('arrival_time', ''),
-                            flight.get('departure_airport', ''),
-                            flight.get('arrival_airport', ''),
-                            flight.get('price', 0)
-                        )
-                        
-                        if flight_id not in seen_flights:
-                            seen_flights.add(flight_id)
-                            unique_flights.append(flight)
-                    
-                    dest_group['flights'] = unique_flights
-                
-                # Convert grouped results back to list
-                results = list(destination_groups.values())
-        else:
-            # Specific destinations
-            for dest in destinations:
-                dest = dest.upper()
-                if dest == origin:
-                    continue
-                     
-                flights = api.check_flight(origin, dest, flight_date)
-                if flights:
-                    # Remove duplicates for specific searches too
-                    unique_flights = []
-                    seen_flights = set()
-                    
-                    for flight in flights:
-                        flight_id = (
-                            flight.get('flight_number', ''),
-                            flight.get('departure_time', ''),
-                            flight.get('arrival_time', ''),
-                            flight.get('departure_airport', ''),
-                            flight.get('arrival_airport', ''),
-                            flight.get('price', 0)
-                        )
-                        
-                        if flight_id not in seen_flights:
-                            seen_flights.add(flight_id)
-                            unique_flights.append(flight)
-                    
-                    results.append({
-                        'destination': dest,
-                        'destination_name': api.airport_names.get(dest, dest),
-                        'flights': unique_flights
-                    })
+        # Opt-in profiling: trace + flamegraph files for just this request.
+        # Only the mode run_search actually ran goes in the name, never raw input;
+        # random suffix so profiles started in the same second don't overwrite each other
+        search_type = data.get('searchType')
+        mode = search_type if search_type in ('all_domestic', 'all_domestic_inbound') else 'specific'
+        name = f"search-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{mode}-{uuid.uuid4().hex[:6]}"
+        profile_dir = os.path.realpath(PROFILE_DIR)
+        path = os.path.realpath(os.path.join(profile_dir, name))
+        if os.path.dirname(path) != profile_dir:
+            raise ValueError("invalid profile name")
+        with ProfileSession(path, only_timeline_threads=True) as session:
+            payload = run_search(data, client, session.timeline)
+        print(f"🔬 Profiled search: {format_summary(session.summary)}")
         
-        return jsonify({
-            'success': True,
-            'results': results,
-            'origin': origin,
-            'origin_name': api.airport_names.get(origin, origin),
-            'date': flight_date.strftime('%A, %B %d, %Y')
-        })
+        response = make_search_response(payload, compact)
+        response.headers['X-GoWild-Profile'] = f"/api/profiles/{name}.json"
+        response.headers['X-GoWild-Profile-Flamegraph'] = f"/api/profiles/{name}.folded"
+        response.headers['Server-Timing'] = ', '.join(
+            f'{category};dur={ms}' for category, ms in session.summary['ms'].items())
+        return response
         
+    except QuotaExceeded as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 429
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+@app.route('/api/export')
+def export_flights():
+    """Bulk export endpoint - streams flights route by route as NDJSON, CSV or Parquet
+    
+    Query parameters:
+        format       ndjson (default), csv or parquet
+        searchType   specific (default), all_domestic or all_domestic_inbound
+        origins      comma separated origin codes (specific / all_domestic)
+        destinations comma separated destination codes (specific / all_domestic_inbound)
+        dates        comma separated YYYY-MM-DD dates
+    """
+    fmt = request.args.get('format', 'ndjson')
+    search_type = request.args.get('searchType', 'specific')
+    origins = [code.strip().upper() for code in request.args.get('origins', '').split(',') if code.strip()]
+    destinations = [code.strip().upper() for code in request.args.get('destinations', '').split(',') if code.strip()]
+    
+    try:
+        dates = [datetime.strptime(value.strip(), '%Y-%m-%d')
+                 for value in request.args.get('dates', '').split(',') if value.strip()]
+        exporter_class = EXPORTERS[fmt]
+        if exporter_class is ParquetExporter and exporters.pq is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        if not dates:
+            raise ValueError("dates is required")
+        if search_type != 'all_domestic_inbound' and not origins:
+            raise ValueError("origins is required")
+        if search_type != 'all_domestic' and not destinations:
+            raise ValueError("destinations is required")
+    except (ValueError, KeyError, RuntimeError) as e:
+        return jsonify({'success': False, 'error': f"Invalid export request: {e}"}), 400
+    
+    # Build (origin, destination, date) route list the same way /api/search does
+    routes = []
+    for flight_date in dates:
+        if search_type == 'all_domestic':
+            for origin in origins:
+                fan = [(origin, airport) for airport in api.domestic_airports if airport != origin]
+                routes.extend((o, d, flight_date) for o, d in limit_discovery_routes(fan, flight_date))
+        elif search_type == 'all_domestic_inbound':
+            for destination in destinations:
+                fan = [(airport, destination) for airport in api.domestic_airports if airport != destination]
+                routes.extend((o, d, flight_date) for o, d in limit_discovery_routes(fan, flight_date))
+        else:
+            routes.extend((origin, destination, flight_date)
+                          for origin in origins for destination in destinations if origin != destination)
+    if not routes:
+        return jsonify({'success': False, 'error': "Invalid export request: no routes to export"}), 400
+    
+    client = client_id()
+    
+    def generate():
+        sink = ChunkSink()
+        exporter = exporter_class(sink)
+        pending = {}
+        remaining = iter(routes)
+        deferred = []  # route the client's quota had no room for yet
+        
+        def refill():
+            # Only a small window is queued at a time so exports stay within the client quota
+            while len(pending) < EXPORT_WINDOW:
+                route = deferred.pop() if deferred else next(remaining, None)
+                if route is None:
+                    break
+                try:
+                    pending[schedule_routes(client, 'bulk', [route])[0]] = route
+                except QuotaExceeded:
+                    # Headers are already sent, so wait for queue space instead of failing mid-stream
+                    deferred.append(route)
+                    break
+        
+        try:
+            refill()
+            # Emit each route as soon as its fetch finishes
+            while pending or deferred:
+                if not pending:
+                    # The client's other searches fill its quota - retry shortly
+                    time.sleep(0.5)
+                    refill()
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    origin, destination, flight_date = pending.pop(future)
+                    exporter.write_route(origin, destination, flight_date.strftime('%Y-%m-%d'),
+                                         dedupe_flights(future.result()))
+                for chunk in sink.drain():
+                    yield chunk
+                refill()
+            exporter.close()
+            for chunk in sink.drain():
+                yield chunk
+        finally:
+            # Client went away or we finished - don't keep fetching for nobody
+            for future in pending:
+                future.cancel()
+    
+    filename = f"gowild-export-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    return Response(generate(), mimetype=exporter_class.mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@app.route('/api/summary')
+def discovery_summary():
+    """Cheapest fare per airport, seats per price tier and counts by stops
+    
+    ?origin=DEN&date=YYYY-MM-DD summarizes flights out of DEN,
+    ?destination=LAS&date=... flights into LAS. Without parameters, lists
+    the airport/date pairs that have a summary.
+    """
+    date_str = request.args.get('date')
+    origin = request.args.get('origin', '').upper()
+    destination = request.args.get('destination', '').upper()
+    
+    if not (origin or destination):
+        return jsonify({
+            'success': True,
+            'available': [{'direction': direction, 'airport': airport, 'date': date}
+                          for direction, airport, date in rollups.available()]
+        })
+    if not date_str or (origin and destination):
+        return jsonify({'success': False, 'error': 'Give a date and either origin or destination'}), 400
+    
+    direction, airport = ('outbound', origin) if origin else ('inbound', destination)
+    summary = rollups.summary(direction, airport, date_str)
+    if summary is None:
+        return jsonify({'success': False, 'error': f'No flights observed {direction} for {airport} on {date_str}'}), 404
+    summary['airport_name'] = AIRPORT_NAMES.get(airport, airport)
+    return jsonify({'success': True, 'summary': summary})
+
+@app.route('/api/subscriptions', methods=['GET', 'POST'])
+def manage_subscriptions():
+    """List saved subscriptions, or save a new one
+    
+    POST body: origins, destinations, date (YYYY-MM-DD), and optionally
+    max_stops, depart_after / depart_before ('6:00 AM'), min_seats and a
+    localhost webhook_url that receives each match as JSON.
+    """
+    if request.method == 'GET':
+        return jsonify({'success': True, 'subscriptions': list(subscriptions.subscriptions.values())})
+    
+    try:
+        # Cached and snapshot answers match right away instead of after the next fetch
+        subscription = subscriptions.create(
+            request.json or {},
+            known_flights=lambda origin, destination, date_str: api.get_cached_flights(
+                origin, destination, datetime.strptime(date_str, '%Y-%m-%d'))
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'subscription': subscription}), 201
+
+@app.route('/api/subscriptions/<subscription_id>', methods=['DELETE'])
+def delete_subscription(subscription_id):
+    """Remove a saved subscription"""
+    if not subscriptions.delete(subscription_id):
+        return jsonify({'success': False, 'error': 'Unknown subscription'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/subscriptions/feed')
+def subscription_feed():
+    """Matches newer than ?since=<seq>, optionally for one ?subscription=<id>"""
+    since = request.args.get('since', 0, type=int)
+    matches = subscriptions.feed(since, request.args.get('subscription'))
+    return jsonify({
+        'success': True,
+        'matches': matches,
+        'last_seq': matches[-1]['seq'] if matches else since
+    })
+
+@app.route('/api/scheduler/stats')
+def scheduler_stats():
+    """Upstream queue depth, per-client load, wait times and limiter state"""
+    return jsonify(dict(scheduler.stats(), limiter=api.limiter.stats()))
+
+@app.route('/api/profiles/<path:filename>')
+def download_profile(filename):
+    """Serve a trace or folded-stack file written by a profiled search"""
+    return send_from_directory(PROFILE_DIR, filename, as_attachment=True)
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=8000)
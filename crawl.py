@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+GoWild Flight Finder - Distributed Crawl
+Spreads route checks over any number of worker processes or machines
+
+A coordinator enqueues (origin, destination, date) tasks into a SQLite file
+that every worker opens. Workers lease one task at a time, fetch it and
+write the flights back; a lease that isn't completed in time (worker died,
+machine went away) is handed to the next worker that asks. Routes are the
+primary key, so enqueueing a route that is queued or freshly done is a
+no-op; a result older than max_age, or a failed route, is queued again.
+
+Upstream load is capped by a single token bucket stored in the same file:
+every worker takes a token before each fetch, so N workers share the
+configured requests-per-minute between them instead of each adding their
+own. More workers only help until the budget is saturated - raise the
+budget (within what upstream tolerates) to go faster.
+
+SQLite locking needs the file on a local disk or a filesystem with working
+locks; for separate machines point them at a shared volume that has them.
+The queue keeps SQLite's rollback journal rather than WAL for that reason:
+WAL coordinates through a shared-memory file that only works when every
+worker runs on the same host.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    date TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending | leased | done | failed
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    flights TEXT,
+    error TEXT,
+    updated REAL,
+    PRIMARY KEY (origin, destination, date)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires);
+CREATE TABLE IF NOT EXISTS budget (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    rate REAL NOT NULL,    -- tokens per second, shared by all workers
+    burst REAL NOT NULL,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Same order of magnitude as a single CLI run's sleep policy
+DEFAULT_REQUESTS_PER_MINUTE = 12
+
+# How old a finished result may be before enqueueing its route fetches it again
+# (the web app trusts a cached route for as long)
+DEFAULT_MAX_AGE = 15 * 60
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class CrawlQueue:
+    """Shared work queue, results and rate budget in one SQLite file"""
+
+    def __init__(self, path, lease_seconds=120, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # Autocommit mode; writes that must be atomic use BEGIN IMMEDIATE
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        # Not WAL - its shared-memory index breaks across machines on a shared volume
+        self.db.execute('PRAGMA journal_mode=DELETE')
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _transaction(self):
+        self.db.execute('BEGIN IMMEDIATE')
+        return self.db
+
+    def set_budget(self, requests_per_minute, burst=None):
+        """Set the upstream budget every worker shares"""
+        if requests_per_minute <= 0:
+            raise ValueError("the request budget must be positive")
+        rate = requests_per_minute / 60.0
+        burst = burst if burst is not None else max(1.0, rate * 5)
+        self.db.execute(
+            'INSERT INTO budget (id, rate, burst, tokens, updated) VALUES (1, ?, ?, ?, ?) '
+            'ON CONFLICT(id) DO UPDATE SET rate = excluded.rate, burst = excluded.burst, '
+            'tokens = MIN(budget.tokens, excluded.burst)',
+            (rate, burst, 1.0, time.time())
+        )
+
+    def enqueue(self, routes, max_age=DEFAULT_MAX_AGE):
+        """Queue (origin, destination, 'YYYY-MM-DD') tasks; returns how many were (re)queued
+
+        Routes already pending or leased are left alone, as are results
+        newer than max_age seconds (None keeps every result). Older results
+        and failed routes go back to pending with a fresh attempt count.
+        """
+        now = time.time()
+        stale_before = now - max_age if max_age is not None else None
+        rows = [(origin, destination, date_str, now) for origin, destination, date_str in routes]
+        db = self._transaction()
+        try:
+            before = db.total_changes
+            db.executemany(
+                'INSERT OR IGNORE INTO tasks (origin, destination, date, updated) VALUES (?, ?, ?, ?)',
+                rows
+            )
+            db.executemany(
+                "UPDATE tasks SET status = 'pending', owner = NULL, lease_expires = NULL, attempts = 0, "
+                "flights = NULL, error = NULL, updated = ? "
+                "WHERE origin = ? AND destination = ? AND date = ? "
+                "AND (status = 'failed' OR (status = 'done' AND ? IS NOT NULL AND updated < ?))",
+                [(now, origin, destination, date_str, stale_before, stale_before)
+                 for origin, destination, date_str, _ in rows]
+            )
+            added = db.total_changes - before
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        if not db.execute('SELECT 1 FROM budget').fetchone():
+            self.set_budget(DEFAULT_REQUESTS_PER_MINUTE)
+        return added
+
+    def take_token(self):
+        """Try to spend one request from the shared budget
+
+        Returns 0 when the caller may fetch now, otherwise the number of
+        seconds to wait before asking again.
+        """
+        now = time.time()
+        db = self._transaction()
+        try:
+            row = db.execute('SELECT rate, burst, tokens, updated FROM budget WHERE id = 1').fetchone()
+            if row is None:
+                db.execute('COMMIT')
+                return 0
+            rate, burst, tokens, updated = row
+            tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            db.execute('UPDATE budget SET tokens = ?, updated = ? WHERE id = 1', (tokens, now))
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return wait
+
+    def refund_token(self):
+        """Give back a token that wasn't used for a fetch"""
+        self.db.execute('UPDATE budget SET tokens = MIN(burst, tokens + 1) WHERE id = 1')
+
+    def _available_clause(self):
+        return "status = 'pending' OR (status = 'leased' AND lease_expires < ?)"
+
+    def has_available(self):
+        """Whether lease() would currently find a task"""
+        return self.db.execute(
+            f"SELECT 1 FROM tasks WHERE {self._available_clause()} LIMIT 1", (time.time(),)
+        ).fetchone() is not None
+
+    def lease(self, worker_id):
+        """Lease the next pending (or abandoned) task, or return None
+
+        A task whose lease lapsed max_attempts times (it keeps killing its
+        worker) is marked failed instead of being handed out again.
+        """
+        now = time.time()
+        db = self._transaction()
+        try:
+            db.execute(
+                "UPDATE tasks SET status = 'failed', owner = NULL, lease_expires = NULL, "
+                "error = COALESCE(error, 'lease expired without a result'), updated = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = db.execute(
+                "SELECT origin, destination, date FROM tasks "
+                f"WHERE {self._available_clause()} "
+                "ORDER BY date, rowid LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated = ? WHERE origin = ? AND destination = ? AND date = ?",
+                    (worker_id, now + self.lease_seconds, now, *row)
+                )
+            self._heartbeat(db, worker_id, now)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return row
+
+    def complete(self, worker_id, task, flights):
+        """Write a task's flights back; False if another worker already did"""
+        now = time.time()
+        db = self._transaction()
+        try:
+            cursor = db.execute(
+                "UPDATE tasks SET status = 'done', owner = ?, flights = ?, error = NULL, "
+                "lease_expires = NULL, updated = ? "
+                "WHERE origin = ? AND destination = ? AND date = ? AND status != 'done'",
+                (worker_id, json.dumps(flights, separators=(',', ':')), now, *task)
+            )
+            if cursor.rowcount:
+                db.execute('UPDATE workers SET completed = completed + 1 WHERE worker_id = ?', (worker_id,))
+            self._heartbeat(db, worker_id, now)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return bool(cursor.rowcount)
+
+    def fail(self, worker_id, task, error):
+        """Release a task for retry, or give up on it after max_attempts"""
+        now = time.time()
+        db = self._transaction()
+        try:
+            db.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, lease_expires = NULL, error = ?, updated = ? "
+                "WHERE origin = ? AND destination = ? AND date = ? AND status = 'leased' AND owner = ?",
+                (self.max_attempts, str(error), now, *task, worker_id)
+            )
+            db.execute('UPDATE workers SET failed = failed + 1 WHERE worker_id = ?', (worker_id,))
+            self._heartbeat(db, worker_id, now)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+    def _heartbeat(self, db, worker_id, now):
+        db.execute(
+            'INSERT INTO workers (worker_id, last_seen) VALUES (?, ?) '
+            'ON CONFLICT(worker_id) DO UPDATE SET last_seen = excluded.last_seen',
+            (worker_id, now)
+        )
+
+    def unfinished(self):
+        """Tasks not yet done or failed (including ones leased to other workers)"""
+        return self.db.execute("SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')").fetchone()[0]
+
+    def results(self):
+        """Yield (origin, destination, date, flights) for every completed task"""
+        for origin, destination, date_str, flights in self.db.execute(
+                "SELECT origin, destination, date, flights FROM tasks WHERE status = 'done' "
+                "ORDER BY date, origin, destination"):
+            yield origin, destination, date_str, json.loads(flights)
+
+    def stats(self):
+        counts = dict(self.db.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+        budget = self.db.execute('SELECT rate FROM budget WHERE id = 1').fetchone()
+        now = time.time()
+        workers = [
+            {'worker_id': worker_id, 'completed': completed, 'failed': failed,
+             'idle_seconds': round(now - last_seen, 1)}
+            for worker_id, last_seen, completed, failed in self.db.execute(
+                'SELECT worker_id, last_seen, completed, failed FROM workers ORDER BY worker_id')
+        ]
+        return {
+            'tasks': {status: counts.get(status, 0) for status in ('pending', 'leased', 'done', 'failed')},
+            'requests_per_minute': round(budget[0] * 60, 2) if budget else None,
+            'workers': workers,
+        }
+
+
+def run_worker(queue, fetch, worker_id=None, poll_interval=5, observers=()):
+    """Lease, fetch and write back tasks until the queue is drained
+
+    fetch(origin, destination, date_str) returns a list of flights and
+    raises on upstream errors so the task can be retried elsewhere.
+    observers(origin, destination, date_str, flights) see every result
+    this worker writes back (e.g. subscription matching).
+    """
+    worker_id = worker_id or default_worker_id()
+    completed = 0
+    print(f"👷 Worker {worker_id} started on {queue.path}")
+
+    while True:
+        if not queue.has_available():
+            if not queue.unfinished():
+                break
+            # Everything left is leased to someone else - wait in case a lease lapses
+            time.sleep(poll_interval)
+            continue
+
+        # Spend budget before leasing so a lease never expires while we wait for it
+        wait = queue.take_token()
+        while wait:
+            time.sleep(wait)
+            wait = queue.take_token()
+
+        task = queue.lease(worker_id)
+        if task is None:
+            # Another worker took the last task while we waited for budget
+            queue.refund_token()
+            continue
+
+        origin, destination, date_str = task
+        try:
+            flights = fetch(origin, destination, date_str)
+        except Exception as e:
+            print(f"   ❌ {origin} → {destination} {date_str}: {e}")
+            queue.fail(worker_id, task, e)
+            continue
+
+        if queue.complete(worker_id, task, flights):
+            completed += 1
+            for observer in observers:
+                observer(origin, destination, date_str, flights)
+        print(f"   ✅ {origin} → {destination} {date_str}: {len(flights)} GoWild flight(s)")
+
+    print(f"🏁 Worker {worker_id} finished - {completed} route(s) checked, queue drained")
+    return completed
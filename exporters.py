@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+GoWild Flight Finder - Machine-Readable Export
+Streams flights route by route as NDJSON, CSV or Parquet
+
+Exporters never hold more than one route's rows (Parquet: one row group),
+so memory stays flat however many routes a discovery run covers.
+"""
+
+import csv
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+EXPORT_FIELDS = [
+    'date', 'origin', 'destination', 'flight_number', 'departure_airport', 'departure_time',
+    'arrival_airport', 'arrival_time', 'duration', 'stops', 'price', 'seats', 'layovers'
+]
+
+
+def _layover_text(layover):
+    # The web app keeps layovers as dicts, the CLI as preformatted strings
+    if isinstance(layover, dict):
+        return f"{layover.get('airport', 'Unknown')} ({layover.get('duration', 'Unknown')})"
+    return str(layover)
+
+
+def flight_rows(origin, destination, date_str, flights):
+    """Flatten one route's flights into export rows"""
+    for flight in flights:
+        yield {
+            'date': date_str,
+            'origin': origin,
+            'destination': destination,
+            'flight_number': str(flight.get('flight_number', 'Unknown')),
+            'departure_airport': flight.get('departure_airport'),
+            'departure_time': flight.get('departure_time'),
+            'arrival_airport': flight.get('arrival_airport'),
+            'arrival_time': flight.get('arrival_time'),
+            'duration': flight.get('duration'),
+            'stops': flight.get('stops'),
+            'price': float(flight.get('price') or 0),
+            'seats': flight.get('seats'),
+            'layovers': [_layover_text(layover) for layover in flight.get('layovers', [])],
+        }
+
+
+class NDJSONExporter:
+    """One JSON object per flight, one flight per line"""
+    binary = False
+    mimetype = 'application/x-ndjson'
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write_route(self, origin, destination, date_str, flights):
+        for row in flight_rows(origin, destination, date_str, flights):
+            self.stream.write(json.dumps(row, separators=(',', ':')) + '\n')
+        self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+
+class CSVExporter:
+    """Header row plus one row per flight; layovers joined with '; '"""
+    binary = False
+    mimetype = 'text/csv'
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS)
+        self.writer.writeheader()
+
+    def write_route(self, origin, destination, date_str, flights):
+        for row in flight_rows(origin, destination, date_str, flights):
+            row['layovers'] = '; '.join(row['layovers'])
+            self.writer.writerow(row)
+        self.stream.flush()
+
+    def close(self):
+        self.stream.flush()
+
+
+class ParquetExporter:
+    """Parquet file written in row groups of batch_size flights"""
+    binary = True
+    mimetype = 'application/vnd.apache.parquet'
+
+    def __init__(self, stream, batch_size=1000):
+        if pq is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self.schema = pa.schema([
+            ('date', pa.string()), ('origin', pa.string()), ('destination', pa.string()),
+            ('flight_number', pa.string()), ('departure_airport', pa.string()),
+            ('departure_time', pa.string()), ('arrival_airport', pa.string()),
+            ('arrival_time', pa.string()), ('duration', pa.string()), ('stops', pa.string()),
+            ('price', pa.float64()), ('seats', pa.int64()), ('layovers', pa.list_(pa.string())),
+        ])
+        self.writer = pq.ParquetWriter(stream, self.schema)
+        self.batch_size = batch_size
+        self.rows = []
+
+    def write_route(self, origin, destination, date_str, flights):
+        self.rows.extend(flight_rows(origin, destination, date_str, flights))
+        if len(self.rows) >= self.batch_size:
+            self._flush_rows()
+
+    def _flush_rows(self):
+        if self.rows:
+            self.writer.write_table(pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self._flush_rows()
+        self.writer.close()
+
+
+EXPORTERS = {
+    'ndjson': NDJSONExporter,
+    'csv': CSVExporter,
+    'parquet': ParquetExporter,
+}
+
+
+class ChunkSink:
+    """Write-only file object that hands written bytes/text back in chunks
+
+    Lets an exporter feed a streaming HTTP response: write into the sink,
+    then drain() whatever accumulated and yield it to the client.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
@@ -7,14 +7,21 @@ Just check specific routes for GoWild availability - no complexity!
 import requests
 import json
 import html
-import random
-import time
 import argparse
+import contextlib
+import sys
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
+from profiling import ProfileSession, span, format_summary
+from exporters import EXPORTERS
+from rollups import RouteRollups
+from subscriptions import SubscriptionStore, DEFAULT_PATH as SUBSCRIPTIONS_PATH
+from limiter import AdaptiveLimiter
+from crawl import CrawlQueue, run_worker, DEFAULT_MAX_AGE
+from airports import AIRPORT_NAMES, DOMESTIC_AIRPORTS
 
 class SimpleGoWildChecker:
-    def __init__(self):
+    def __init__(self, min_interval=1.0, max_interval=60.0):
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -24,65 +31,76 @@ class SimpleGoWildChecker:
             "Connection": "keep-alive"
         })
         
-        # Domestic US airports for --all-domestic search
-        self.domestic_airports = [
-            'ATL', 'DEN', 'DFW', 'ORD', 'LAX', 'LAS', 'PHX', 'MIA', 'MCO', 'TPA', 'SFO', 'SEA',
-            'LGA', 'JFK', 'BOS', 'PHL', 'BWI', 'DCA', 'CLT', 'RDU', 'BUF', 'ISP', 'SYR', 'PWM',
-            'BTV', 'MDT', 'PIT', 'CLE', 'CVG', 'CMH', 'IND', 'DTW', 'MSP', 'MKE', 'GRB', 'MSN',
-            'GRR', 'ORF', 'RIC', 'CHS', 'SAV', 'JAX', 'PNS', 'SRQ', 'FLL', 'RSW', 'PBI',
-            'MYR', 'TTN', 'EWR', 'SJC', 'OAK', 'SAN', 'SMF', 'SNA', 'ONT', 'BUR', 'PSP',
-            'PDX', 'SLC', 'RNO', 'BOI', 'MSO', 'GEG', 'FAR', 'FSD', 'AUS', 'SAT', 'IAH', 'HOU',
-            'ELP', 'CRP', 'TUS', 'OKC', 'TUL', 'MCI', 'STL', 'MSY', 'MEM', 'BNA', 'TYS', 'LIT',
-            'XNA', 'DSM', 'CID', 'OMA'
-        ]
-        
-        # Airport names for display - comprehensive Frontier route list
-        self.airport_names = {
-            # Major US Hubs
-            'ATL': 'Atlanta, GA', 'DEN': 'Denver, CO', 'DFW': 'Dallas, TX', 'ORD': 'Chicago, IL',
-            'LAX': 'Los Angeles, CA', 'LAS': 'Las Vegas, NV', 'PHX': 'Phoenix, AZ', 'MIA': 'Miami, FL',
-            'MCO': 'Orlando, FL', 'TPA': 'Tampa, FL', 'SFO': 'San Francisco, CA', 'SEA': 'Seattle, WA',
-            
-            # East Coast
-            'LGA': 'LaGuardia, NY', 'JFK': 'JFK New York, NY', 'BOS': 'Boston, MA', 'PHL': 'Philadelphia, PA',
-            'BWI': 'Baltimore, MD', 'DCA': 'Washington DC', 'CLT': 'Charlotte, NC', 'RDU': 'Raleigh, NC',
-            'BUF': 'Buffalo, NY', 'ISP': 'Islip, NY', 'SYR': 'Syracuse, NY', 'PWM': 'Portland, ME',
-            'BTV': 'Burlington, VT', 'MDT': 'Harrisburg, PA', 'PIT': 'Pittsburgh, PA', 'CLE': 'Cleveland, OH',
-            'CVG': 'Cincinnati, OH', 'CMH': 'Columbus, OH', 'IND': 'Indianapolis, IN', 'DTW': 'Detroit, MI',
-            'MSP': 'Minneapolis, MN', 'MKE': 'Milwaukee, WI', 'GRB': 'Green Bay, WI', 'MSN': 'Madison, WI',
-            'GRR': 'Grand Rapids, MI', 'ORF': 'Norfolk, VA', 'RIC': 'Richmond, VA', 'CHS': 'Charleston, SC',
-            'SAV': 'Savannah, GA', 'JAX': 'Jacksonville, FL', 'PNS': 'Pensacola, FL', 'SRQ': 'Sarasota, FL',
-            'FLL': 'Fort Lauderdale, FL', 'RSW': 'Fort Myers, FL', 'PBI': 'West Palm Beach, FL',
-            'MYR': 'Myrtle Beach, SC', 'TTN': 'Trenton, NJ', 'EWR': 'Newark, NJ', 'HPN': 'White Plains, NY',
-            
-            # West Coast  
-            'SJC': 'San Jose, CA', 'OAK': 'Oakland, CA', 'SAN': 'San Diego, CA', 'SMF': 'Sacramento, CA',
-            'SNA': 'Orange County, CA', 'ONT': 'Ontario, CA', 'BUR': 'Burbank, CA', 'PSP': 'Palm Springs, CA',
-            'PDX': 'Portland, OR', 'SLC': 'Salt Lake City, UT', 'RNO': 'Reno, NV', 'BOI': 'Boise, ID',
-            'MSO': 'Missoula, MT', 'GEG': 'Spokane, WA', 'FAR': 'Fargo, ND', 'FSD': 'Sioux Falls, SD',
-            
-            # Central US
-            'AUS': 'Austin, TX', 'SAT': 'San Antonio, TX', 'IAH': 'Houston, TX', 'HOU': 'Houston Hobby, TX',
-            'ELP': 'El Paso, TX', 'CRP': 'Corpus Christi, TX', 'TUS': 'Tucson, AZ', 'OKC': 'Oklahoma City, OK',
-            'TUL': 'Tulsa, OK', 'MCI': 'Kansas City, MO', 'STL': 'St. Louis, MO', 'MSY': 'New Orleans, LA',
-            'MEM': 'Memphis, TN', 'BNA': 'Nashville, TN', 'TYS': 'Knoxville, TN', 'LIT': 'Little Rock, AR',
-            'XNA': 'Bentonville, AR', 'DSM': 'Des Moines, IA', 'CID': 'Cedar Rapids, IA', 'OMA': 'Omaha, NE',
-            
-            # International/Caribbean
-            'CUN': 'Cancun, Mexico', 'PVR': 'Puerto Vallarta, Mexico', 'SJD': 'Los Cabos, Mexico',
-            'SJU': 'San Juan, Puerto Rico', 'BQN': 'Aguadilla, Puerto Rico', 'PSE': 'Ponce, Puerto Rico',
-            'STX': 'St. Croix, USVI', 'STT': 'St. Thomas, USVI', 'SXM': 'St. Maarten', 'ANU': 'Antigua',
-            'NAS': 'Nassau, Bahamas', 'MBJ': 'Montego Bay, Jamaica', 'KIN': 'Kingston, Jamaica',
-            'PUJ': 'Punta Cana, DR', 'SDQ': 'Santo Domingo, DR', 'STI': 'Santiago, DR', 'POP': 'Puerto Plata, DR',
-            'SAL': 'San Salvador, El Salvador', 'GUA': 'Guatemala City', 'SJO': 'San Jose, Costa Rica',
-            'SAP': 'San Pedro Sula, Honduras', 'BGI': 'Bridgetown, Barbados', 'POS': 'Port of Spain, Trinidad',
-            'AUA': 'Aruba', 'PLS': 'Providenciales, Turks & Caicos'
-        }
+        # Shared, read-only airport catalog (see airports.py)
+        self.domestic_airports = DOMESTIC_AIRPORTS
+        self.airport_names = AIRPORT_NAMES
+        
+        # Route answers already fetched in this run, keyed by (origin, destination, date).
+        # Streaming exports switch this off so memory stays flat on huge runs.
+        self.route_cache = {}
+        self.keep_route_cache = True
+        
+        # One request at a time; the gap between them adapts to upstream latency and errors
+        self.limiter = AdaptiveLimiter('Frontier', max_limit=1, initial_limit=1,
+                                       min_interval=min_interval, max_interval=max_interval,
+                                       initial_interval=min(max(3.0, min_interval), max_interval))
+        
+        # Discovery summaries, updated as each route is fetched (not in exports)
+        self.rollups = RouteRollups()
+        
+        # The web app's saved searches - CLI and crawl fetches match them too
+        self.subscriptions = SubscriptionStore(SUBSCRIPTIONS_PATH)
+        
+        # Set to a profiling.RouteTimeline to record per-route timings (--profile)
+        self.timeline = None
 
     def check_flight(self, origin, destination, date, quiet_mode=False):
         """Check a single route for GoWild flights"""
+        with span(self.timeline, f"{origin}→{destination}", 'route', origin=origin, destination=destination) as route:
+            return self._check_flight(origin, destination, date, quiet_mode, route)
+
+    def _check_flight(self, origin, destination, date, quiet_mode, route):
+        if not quiet_mode:
+            print(f"Checking {origin} → {destination} ({self.airport_names.get(destination, destination)})...")
+        
+        # Reuse an earlier answer for this exact route and date
+        cache_key = (origin, destination, date.strftime('%Y-%m-%d'))
+        if cache_key in self.route_cache:
+            flights = self.route_cache[cache_key]
+            route.update(cached=True, flights=len(flights))
+            if not quiet_mode:
+                self._print_flights(flights)
+            return flights
+        
+        try:
+            flights = self.fetch_flights(origin, destination, date, route)
+        except requests.HTTPError as e:
+            print(f"  ❌ Error: {e}")
+            return []
+        except Exception as e:
+            print(f"  ❌ Error checking route: {e}")
+            print()
+            route.update(error=str(e))
+            return []
+        
+        if self.keep_route_cache:
+            # Exports never print summaries, so rollups are skipped with the cache
+            self.route_cache[cache_key] = flights
+            self.rollups.observe(origin, destination, cache_key[2], flights)
+        self.notify_subscriptions(origin, destination, cache_key[2], flights)
+        
         if not quiet_mode:
-        print(f"Checking {origin} → {destination} ({self.airport_names.get(destination, destination)})...")
+            self._print_flights(flights)
+        return flights
+
+    def fetch_flights(self, origin, destination, date, route=None):
+        """Fetch and parse one route straight from upstream, bypassing the cache
+        
+        Paced by the adaptive limiter. Raises on network errors and non-200
+        responses, so callers with their own retry policy (crawl workers) can
+        tell failures from routes that simply have no GoWild flights.
+        """
+        route = route if route is not None else {}
         
         # Format date for URL
         date_str = date.strftime("%b-%d,-%Y").replace("-", "%20")
@@ -90,82 +108,95 @@ class SimpleGoWildChecker:
         # Build URL
         url = f"https://booking.flyfrontier.com/Flight/InternalSelect?o1={origin}&d1={destination}&dd1={date_str}&ADT=1&mon=true&promo="
         
-        # Add some delay to be respectful
-        time.sleep(random.uniform(2, 4))
+        # Wait for the limiter's current pace to be respectful
+        with span(self.timeline, 'sleep', 'sleep'):
+            ticket = self.limiter.acquire()
         
-        try:
-            # Make request
+        # Make request
+        with ticket, span(self.timeline, 'fetch', 'fetch') as fetch:
             response = self.session.get(url, timeout=30)
-            
-            if response.status_code != 200:
-                print(f"  ❌ Error: HTTP {response.status_code}")
-                return []
-            
-            # Extract flight data
+            ticket.record(response)
+            fetch.update(status=response.status_code, bytes=len(response.content))
+        route.update(status=response.status_code, bytes=len(response.content))
+        
+        if response.status_code != 200:
+            raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+        
+        # Extract flight data
+        with span(self.timeline, 'parse', 'parse'):
             flights = self._extract_gowild_flights(response, origin, destination)
+        route.update(flights=len(flights))
+        return flights
+
+    def notify_subscriptions(self, origin, destination, date_str, flights):
+        """Match freshly fetched flights against saved subscriptions"""
+        self.subscriptions.refresh()
+        for match in self.subscriptions.observe(origin, destination, date_str, flights):
+            flight = match['flight']
+            print(f"   🔔 Subscription {match['subscription_id']} matched: {origin} → {destination} {date_str} "
+                  f"flight {flight.get('flight_number', 'Unknown')} at {flight.get('departure_time')} for ${flight.get('price')}")
+
+    def is_cached(self, origin, destination, date):
+        """Whether a route/date has already been answered in this run"""
+        return (origin, destination, date.strftime('%Y-%m-%d')) in self.route_cache
+
+    def _print_flights(self, flights):
+        """Print the detailed flight list for a single route"""
+        if not flights:
+            print(f"  ❌ No GoWild flights found")
+            print()
+            return
+        
+        print(f"  ✅ Found {len(flights)} GoWild flight(s)!")
+        for i, flight in enumerate(flights, 1):
+            print(f"    {i}. {flight['stops']} - ${flight['price']}")
             
-            if flights:
-                if not quiet_mode:
-                print(f"  ✅ Found {len(flights)} GoWild flight(s)!")
-                for i, flight in enumerate(flights, 1):
-                    print(f"    {i}. {flight['stops']} - ${flight['price']}")
-                        
-                        # Show detailed leg-by-leg information
-                        if 'all_legs' in flight and len(flight['all_legs']) > 1:
-                            # Multi-leg flight - show each segment
-                            for leg_idx, leg in enumerate(flight['all_legs']):
-                                dep_airport = leg.get('departureStation', 'Unknown')
-                                arr_airport = leg.get('arrivalStation', 'Unknown') 
-                                dep_time = leg.get('departureDateFormatted', 'Unknown')
-                                arr_time = leg.get('arrivalDateFormatted', 'Unknown')
-                                
-                                if leg_idx == 0:
-                                    print(f"       🛫 Departs: {dep_time} from {dep_airport}")
-                                
-                                print(f"       ✈️  Leg {leg_idx + 1}: {dep_airport} → {arr_airport}")
-                                print(f"           Arrives: {arr_time} at {arr_airport}")
-                                
-                                # Show layover info if not the last leg
-                                if leg_idx < len(flight['all_legs']) - 1:
-                                    next_leg = flight['all_legs'][leg_idx + 1]
-                                    next_dep_time = next_leg.get('departureDateFormatted', 'Unknown')
-                                    layover_duration = self._calculate_layover_duration(arr_time, next_dep_time)
-                                    print(f"           🔄 Layover at {arr_airport}: {layover_duration}")
-                                    print(f"           🛫 Next departure: {next_dep_time}")
-                            
-                            # Final arrival
-                            final_leg = flight['all_legs'][-1]
-                            final_arr_time = final_leg.get('arrivalDateFormatted', 'Unknown')
-                            final_arr_airport = final_leg.get('arrivalStation', 'Unknown')
-                            print(f"       🛬 Final arrival: {final_arr_time} at {final_arr_airport}")
-                        else:
-                            # Single leg flight
-                            print(f"       🛫 Departs: {flight['departure_time']} from {flight['departure_airport']}")
-                            print(f"       🛬 Arrives: {flight['arrival_time']} at {flight['arrival_airport']}")
-                        
-                        print(f"       ⏱️  Total Duration: {flight['duration']}")
-                        
-                        if flight['flight_number'] != 'Unknown':
-                            aircraft_info = f"Flight {flight['flight_number']}"
-                            if flight['aircraft_type'] != 'Unknown':
-                                aircraft_info += f" ({flight['aircraft_type']})"
-                            print(f"       ✈️  {aircraft_info}")
-                        
-                    if flight['seats']:
-                            print(f"       💺 Seats available: {flight['seats']}")
-                        
-                        print()
-                print()
-                return flights
-            else:
-                print(f"  ❌ No GoWild flights found")
-                print()
-                return []
+            # Show detailed leg-by-leg information
+            if 'all_legs' in flight and len(flight['all_legs']) > 1:
+                # Multi-leg flight - show each segment
+                for leg_idx, leg in enumerate(flight['all_legs']):
+                    dep_airport = leg.get('departureStation', 'Unknown')
+                    arr_airport = leg.get('arrivalStation', 'Unknown') 
+                    dep_time = leg.get('departureDateFormatted', 'Unknown')
+                    arr_time = leg.get('arrivalDateFormatted', 'Unknown')
+                    
+                    if leg_idx == 0:
+                        print(f"       🛫 Departs: {dep_time} from {dep_airport}")
+                    
+                    print(f"       ✈️  Leg {leg_idx + 1}: {dep_airport} → {arr_airport}")
+                    print(f"           Arrives: {arr_time} at {arr_airport}")
+                    
+                    # Show layover info if not the last leg
+                    if leg_idx < len(flight['all_legs']) - 1:
+                        next_leg = flight['all_legs'][leg_idx + 1]
+                        next_dep_time = next_leg.get('departureDateFormatted', 'Unknown')
+                        layover_duration = self._calculate_layover_duration(arr_time, next_dep_time)
+                        print(f"           🔄 Layover at {arr_airport}: {layover_duration}")
+                        print(f"           🛫 Next departure: {next_dep_time}")
                 
-        except Exception as e:
-            print(f"  ❌ Error checking route: {e}")
+                # Final arrival
+                final_leg = flight['all_legs'][-1]
+                final_arr_time = final_leg.get('arrivalDateFormatted', 'Unknown')
+                final_arr_airport = final_leg.get('arrivalStation', 'Unknown')
+                print(f"       🛬 Final arrival: {final_arr_time} at {final_arr_airport}")
+            else:
+                # Single leg flight
+                print(f"       🛫 Departs: {flight['departure_time']} from {flight['departure_airport']}")
+                print(f"       🛬 Arrives: {flight['arrival_time']} at {flight['arrival_airport']}")
+            
+            print(f"       ⏱️  Total Duration: {flight['duration']}")
+            
+            if flight['flight_number'] != 'Unknown':
+                aircraft_info = f"Flight {flight['flight_number']}"
+                if flight['aircraft_type'] != 'Unknown':
+                    aircraft_info += f" ({flight['aircraft_type']})"
+                print(f"       ✈️  {aircraft_info}")
+            
+            if flight['seats']:
+                print(f"       💺 Seats available: {flight['seats']}")
+            
             print()
-            return []
+        print()
 
     def _extract_gowild_flights(self, response, origin, destination):
         """Extract GoWild flights from response"""
@@ -406,88 +437,133 @@ class SimpleGoWildChecker:
         print("=" * 80)
         
         # Filter out the origin airport from domestic list
-        destinations_to_check = [airport for airport in self.domestic_airports if airport != origin.upper()]
+        routes_to_check = [(origin.upper(), airport) for airport in self.domestic_airports if airport != origin.upper()]
         
-        all_flights = []
-        available_destinations = []
-        total_checked = 0
+        self._discover_routes(routes_to_check, date, 'destination')
+        summary = self.rollups.summary('outbound', origin.upper(), date.strftime('%Y-%m-%d'))
         
-        for i, destination in enumerate(destinations_to_check, 1):
-            print(f"\n[{i}/{len(destinations_to_check)}] Checking {origin} → {destination} ({self.airport_names.get(destination, destination)})...")
+        # Final comprehensive summary
+        print("\n" + "=" * 80)
+        print("🎯 DOMESTIC DISCOVERY COMPLETE!")
+        print("=" * 80)
+        print(f"📊 Checked {len(routes_to_check)} domestic destinations")
+        
+        if summary and summary['flights']:
+            self._print_discovery_summary(summary, 'destinations')
+        else:
+            print("❌ No GoWild flights found to any domestic destination")
+
+    def discover_all_inbound(self, destination, date):
+        """Discover every domestic airport with GoWild flights into a destination"""
+        print(f"🔍🌎 DISCOVERING ALL DOMESTIC GOWILD FLIGHTS INTO {destination}")
+        print(f"📅 Date: {date.strftime('%A, %B %d, %Y')}")
+        print(f"🎯 Searching {len(self.domestic_airports)} domestic origins...")
+        print("=" * 80)
+        print("⚠️  This will take a while - being respectful to Frontier's servers")
+        print("=" * 80)
+        
+        # Filter out the destination airport from domestic list
+        routes_to_check = [(airport, destination.upper()) for airport in self.domestic_airports if airport != destination.upper()]
+        
+        self._discover_routes(routes_to_check, date, 'origin')
+        summary = self.rollups.summary('inbound', destination.upper(), date.strftime('%Y-%m-%d'))
+        
+        # Final comprehensive summary
+        print("\n" + "=" * 80)
+        print("🎯 INBOUND DISCOVERY COMPLETE!")
+        print("=" * 80)
+        print(f"📊 Checked {len(routes_to_check)} domestic origins")
+        
+        if summary and summary['flights']:
+            self._print_discovery_summary(summary, 'origins')
+        else:
+            print(f"❌ No GoWild flights found from any domestic origin into {destination}")
+
+    def _discover_routes(self, routes_to_check, date, fan_side):
+        """Check a fan of routes, pausing between upstream requests only"""
+        for i, (origin, destination) in enumerate(routes_to_check, 1):
+            airport = destination if fan_side == 'destination' else origin
+            print(f"\n[{i}/{len(routes_to_check)}] Checking {origin} → {destination} ({self.airport_names.get(airport, airport)})...")
             
-            # Add respectful delays between each check
-            if i > 1:  # Don't delay before the first request
-                print("   ⏳ Pausing to be respectful to servers...")
-                time.sleep(random.uniform(5, 8))  # Longer delays for discovery mode
+            # Pacing between upstream checks is up to the adaptive limiter
+            if self.is_cached(origin, destination, date):
+                print("   ♻️  Using result already fetched in this run")
             
-            flights = self.check_flight(origin.upper(), destination, date, quiet_mode=True)
-            total_checked += 1
+            flights = self.check_flight(origin, destination, date, quiet_mode=True)
             
             if flights:
-                all_flights.extend(flights)
-                available_destinations.append(destination)
                 print(f"   ✅ Found {len(flights)} GoWild flights!")
             else:
                 print(f"   ❌ No GoWild flights")
+
+    def export_routes(self, routes_to_check, date, exporter):
+        """Stream each route's flights to an exporter as soon as they're parsed"""
+        date_str = date.strftime('%Y-%m-%d')
+        total_flights = 0
         
-        # Final comprehensive summary
-        print("\n" + "=" * 80)
-        print("🎯 DOMESTIC DISCOVERY COMPLETE!")
-        print("=" * 80)
-        print(f"📊 Checked {total_checked} domestic destinations")
-        print(f"📊 Found GoWild flights to {len(available_destinations)} destinations")
-        print(f"📊 Total GoWild flights discovered: {len(all_flights)}")
+        for i, (origin, destination) in enumerate(routes_to_check, 1):
+            flights = self.check_flight(origin, destination, date, quiet_mode=True)
+            exporter.write_route(origin, destination, date_str, flights)
+            total_flights += len(flights)
+            print(f"[{i}/{len(routes_to_check)}] {origin} → {destination} {date_str}: {len(flights)} GoWild flight(s)")
         
-        if available_destinations:
-            # Group by price for better overview
-            price_groups = {}
-            for flight in all_flights:
-                price = flight['price']
-                if price not in price_groups:
-                    price_groups[price] = []
-                price_groups[price].append(flight)
+        return total_flights
+
+    def _print_discovery_summary(self, summary, label):
+        """Print a discovery run's totals and breakdowns straight from its rollup"""
+        print(f"📊 Found GoWild flights {'to' if label == 'destinations' else 'from'} {summary['routes_with_flights']} {label}")
+        print(f"📊 Total GoWild flights discovered: {summary['flights']}")
+        
+        print(f"\n💰 PRICE BREAKDOWN:")
+        for tier in summary['tiers']:
+            if not tier['flights']:
+                continue
+            seats = f"{tier['seats']} seats"
+            if tier['open_flights']:
+                seats += f" + {tier['open_flights']} flight(s) with plenty"
+            print(f"   {tier['tier']}: {tier['flights']} flights to {len(tier['airports'])} {label} ({seats})")
+            print(f"      {label.capitalize()}: {', '.join(tier['airports'][:10])}")
+            if len(tier['airports']) > 10:
+                print(f"      + {len(tier['airports']) - 10} more...")
+        
+        stops = ', '.join(f"{count} {'nonstop' if stops == '0' else stops + ' stop(s)'}"
+                          for stops, count in summary['stops'].items())
+        print(f"\n🛑 BY STOPS: {stops}")
+        
+        print(f"\n📍 ALL AVAILABLE {label.upper()} (cheapest fare first):")
+        # Print in rows of 6 for better readability
+        cheapest = summary['cheapest']
+        for i in range(0, len(cheapest), 6):
+            row = cheapest[i:i+6]
+            airports_with_fares = [f"{entry['airport']}({self.airport_names.get(entry['airport'], entry['airport'])[:3]}) ${entry['price']:.2f}"
+                                   for entry in row]
+            print(f"   {' | '.join(airports_with_fares)}")
+
+def run(checker, args):
+    """Dispatch the parsed command line to the checker"""
+    if args.all_domestic_inbound:
+        # Reverse discovery mode - fan in from every domestic airport
+        destination = args.destinations[0].upper()
+        if args.both:
+            today = datetime.now()
+            tomorrow = today + timedelta(days=1)
             
-            print(f"\n💰 PRICE BREAKDOWN:")
-            for price in sorted(price_groups.keys()):
-                flights_at_price = price_groups[price]
-                destinations_at_price = set()
-                for flight in flights_at_price:
-                    destinations_at_price.add(flight['arrival_airport'])
-                
-                print(f"   ${price}: {len(flights_at_price)} flights to {len(destinations_at_price)} destinations")
-                dest_list = sorted(list(destinations_at_price))
-                print(f"      Destinations: {', '.join(dest_list[:10])}")
-                if len(dest_list) > 10:
-                    print(f"      + {len(dest_list) - 10} more...")
+            print("🔍🔍 INBOUND DISCOVERY FOR BOTH TODAY AND TOMORROW 🔍🔍")
+            print("=" * 80)
+            
+            print("\n🌅 TODAY'S INBOUND DISCOVERY:")
+            print("=" * 50)
+            checker.discover_all_inbound(destination, today)
+            
+            print("\n" + "=" * 80)
             
-            print(f"\n📍 ALL AVAILABLE DESTINATIONS:")
-            sorted_destinations = sorted(available_destinations)
-            # Print in rows of 8 for better readability
-            for i in range(0, len(sorted_destinations), 8):
-                row = sorted_destinations[i:i+8]
-                dest_with_names = [f"{code}({self.airport_names.get(code, code)[:3]})" for code in row]
-                print(f"   {' | '.join(dest_with_names)}")
+            print("\n🌄 TOMORROW'S INBOUND DISCOVERY:")
+            print("=" * 50)
+            checker.discover_all_inbound(destination, tomorrow)
         else:
-            print("❌ No GoWild flights found to any domestic destination")
-
-def main():
-    parser = argparse.ArgumentParser(description='Check specific routes for Frontier GoWild flights')
-    parser.add_argument('-o', '--origin', required=True, help='Origin airport code (e.g., LGA)')
-    parser.add_argument('-d', '--destinations', nargs='+', help='Destination airport codes (e.g., SJC SFO DEN)')
-    parser.add_argument('--days', type=int, default=1, help='Days from today (default: 1 = tomorrow)')
-    parser.add_argument('--both', action='store_true', help='Check both today and tomorrow')
-    parser.add_argument('--all-domestic', action='store_true', help='Check all domestic US destinations from origin (discovers all GoWild options)')
-    
-    args = parser.parse_args()
-    
-    # Validate arguments
-    if not args.all_domestic and not args.destinations:
-        parser.error("Either --destinations or --all-domestic must be specified")
-    
-    # Create checker
-    checker = SimpleGoWildChecker()
-    
-    if args.all_domestic:
+            flight_date = datetime.now() + timedelta(days=args.days)
+            checker.discover_all_inbound(destination, flight_date)
+    elif args.all_domestic:
         # Domestic discovery mode
         if args.both:
             # Discovery mode for both days
@@ -516,7 +592,183 @@ def main():
     else:
         # Check single date for specific destinations
         flight_date = datetime.now() + timedelta(days=args.days)
-    checker.check_multiple_routes(args.origin.upper(), args.destinations, flight_date)
+        checker.check_multiple_routes(args.origin.upper(), args.destinations, flight_date)
+
+def run_export(checker, args):
+    """Stream the requested routes as NDJSON/CSV/Parquet instead of printing text"""
+    if args.format == 'parquet' and (not args.output or args.output == '-'):
+        raise SystemExit("--format parquet needs --output PATH")
+    
+    exporter_class = EXPORTERS[args.format]
+    if args.output and args.output != '-':
+        stream = open(args.output, 'wb' if exporter_class.binary else 'w', newline=None if exporter_class.binary else '')
+    else:
+        stream = sys.stdout
+    
+    # Progress and errors go to stderr so stdout carries only the export
+    with contextlib.redirect_stdout(sys.stderr):
+        exporter = exporter_class(stream)
+        try:
+            for date in requested_dates(args):
+                checker.export_routes(requested_routes(checker, args), date, exporter)
+        finally:
+            exporter.close()
+            if stream is not sys.stdout:
+                stream.close()
+
+def requested_dates(args):
+    """Dates selected by --days / --both"""
+    if args.both:
+        today = datetime.now()
+        return [today, today + timedelta(days=1)]
+    return [datetime.now() + timedelta(days=args.days)]
+
+def requested_routes(checker, args):
+    """(origin, destination) pairs selected on the command line"""
+    if args.all_domestic_inbound:
+        destination = args.destinations[0].upper()
+        return [(airport, destination) for airport in checker.domestic_airports if airport != destination]
+    origin = args.origin.upper()
+    if args.all_domestic:
+        return [(origin, airport) for airport in checker.domestic_airports if airport != origin]
+    return [(origin, destination.upper()) for destination in args.destinations if destination.upper() != origin]
+
+def run_crawl(checker, args):
+    """Coordinator/worker commands for a crawl shared through --queue"""
+    queue = CrawlQueue(args.queue)
+    try:
+        if args.crawl == 'enqueue':
+            if args.rate is not None:
+                queue.set_budget(args.rate)
+            routes = requested_routes(checker, args)
+            tasks = [(origin, destination, date.strftime('%Y-%m-%d'))
+                     for date in requested_dates(args) for origin, destination in routes]
+            max_age = args.max_age * 60 if args.max_age is not None else None
+            added = queue.enqueue(tasks, max_age=max_age)
+            print(f"📥 Queued {added} route check(s) in {args.queue} "
+                  f"({len(tasks) - added} already queued or done recently)")
+            print(f"   Start workers with: python gowild_finder.py --crawl work --queue {args.queue}")
+        elif args.crawl == 'work':
+            def fetch(origin, destination, date_str):
+                return checker.fetch_flights(origin, destination, datetime.strptime(date_str, '%Y-%m-%d'))
+            run_worker(queue, fetch, args.worker_id, observers=[checker.notify_subscriptions])
+        elif args.crawl == 'collect' and args.format != 'text':
+            collect_crawl(queue, args)
+        else:
+            print_crawl_status(queue, show_routes=args.crawl == 'collect')
+    finally:
+        queue.close()
+
+def collect_crawl(queue, args):
+    """Export every completed crawl result in the chosen --format"""
+    if args.format == 'parquet' and (not args.output or args.output == '-'):
+        raise SystemExit("--format parquet needs --output PATH")
+    
+    exporter_class = EXPORTERS[args.format]
+    if args.output and args.output != '-':
+        stream = open(args.output, 'wb' if exporter_class.binary else 'w', newline=None if exporter_class.binary else '')
+    else:
+        stream = sys.stdout
+    
+    exporter = exporter_class(stream)
+    try:
+        for origin, destination, date_str, flights in queue.results():
+            exporter.write_route(origin, destination, date_str, flights)
+    finally:
+        exporter.close()
+        if stream is not sys.stdout:
+            stream.close()
+
+def print_crawl_status(queue, show_routes=False):
+    """Queue progress, per-worker counts and (for collect) routes with flights"""
+    stats = queue.stats()
+    tasks = stats['tasks']
+    print(f"🗂️  Crawl queue: {sum(tasks.values())} route(s) - {tasks['done']} done, {tasks['pending']} pending, "
+          f"{tasks['leased']} in progress, {tasks['failed']} failed")
+    if stats['requests_per_minute'] is not None:
+        print(f"   Upstream budget: {stats['requests_per_minute']} requests/minute shared by all workers")
+    for worker in stats['workers']:
+        print(f"   👷 {worker['worker_id']}: {worker['completed']} done, {worker['failed']} failed, "
+              f"last seen {worker['idle_seconds']}s ago")
+    
+    if show_routes:
+        print()
+        for origin, destination, date_str, flights in queue.results():
+            if flights:
+                cheapest = min(flight['price'] for flight in flights)
+                print(f"   ✅ {date_str} {origin} → {destination}: {len(flights)} GoWild flight(s) from ${cheapest}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Check specific routes for Frontier GoWild flights')
+    parser.add_argument('-o', '--origin', help='Origin airport code (e.g., LGA)')
+    parser.add_argument('-d', '--destinations', nargs='+', help='Destination airport codes (e.g., SJC SFO DEN)')
+    parser.add_argument('--days', type=int, default=1, help='Days from today (default: 1 = tomorrow)')
+    parser.add_argument('--both', action='store_true', help='Check both today and tomorrow')
+    parser.add_argument('--all-domestic', action='store_true', help='Check all domestic US destinations from origin (discovers all GoWild options)')
+    parser.add_argument('--all-domestic-inbound', action='store_true', help='Check all domestic US origins into a single destination given with -d (plan a return leg)')
+    parser.add_argument('--format', choices=['text'] + list(EXPORTERS), default='text', help='Output format: human readable text (default) or a streamed machine-readable export')
+    parser.add_argument('--output', metavar='PATH', help='Write the export to PATH instead of stdout (required for parquet)')
+    parser.add_argument('--profile', metavar='PATH', help='Profile the run: writes PATH.json (Chrome/Perfetto trace) and PATH.folded (flamegraph stacks)')
+    parser.add_argument('--crawl', choices=['enqueue', 'work', 'status', 'collect'], help='Distributed crawl: enqueue the selected routes, work the queue (run on as many machines as you like), show status, or collect results')
+    parser.add_argument('--queue', metavar='PATH', default='gowild_crawl.db', help='SQLite crawl queue shared by all workers (default: gowild_crawl.db)')
+    parser.add_argument('--rate', type=float, metavar='PER_MINUTE', help='Total upstream requests per minute across all crawl workers')
+    parser.add_argument('--worker-id', help='Name for this crawl worker (default: hostname-pid)')
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE / 60, metavar='MINUTES', help='With --crawl enqueue, re-check routes whose results are older than this (default: 15)')
+    parser.add_argument('--min-interval', type=float, default=1.0, metavar='SECONDS', help='Shortest gap between upstream requests the adaptive pacing may reach (default: 1.0)')
+    parser.add_argument('--max-interval', type=float, default=60.0, metavar='SECONDS', help='Longest gap between upstream requests when backing off (default: 60)')
+    
+    args = parser.parse_args()
+    
+    # Validate arguments
+    if args.rate is not None:
+        if args.crawl != 'enqueue':
+            parser.error("--rate sets the shared crawl budget and only goes with --crawl enqueue")
+        if args.rate <= 0:
+            parser.error("--rate must be a positive number of requests per minute")
+    if args.max_age < 0:
+        parser.error("--max-age can't be negative")
+    if args.min_interval <= 0 or args.max_interval < args.min_interval:
+        parser.error("--min-interval must be positive and no larger than --max-interval")
+    
+    if args.crawl and args.crawl != 'enqueue':
+        pass  # Workers and status read everything they need from the queue
+    elif args.all_domestic_inbound:
+        if not args.destinations or len(args.destinations) != 1:
+            parser.error("--all-domestic-inbound needs exactly one destination via --destinations")
+    elif not args.origin:
+        parser.error("--origin is required unless --all-domestic-inbound is used")
+    elif not args.all_domestic and not args.destinations:
+        parser.error("Either --destinations or --all-domestic must be specified")
+    
+    # Create checker
+    checker = SimpleGoWildChecker(min_interval=args.min_interval, max_interval=args.max_interval)
+    
+    if args.crawl:
+        command = run_crawl
+        log = sys.stdout
+    elif args.format == 'text':
+        command = run
+        log = sys.stdout
+    else:
+        # Exports stream one route at a time, so don't keep every answer around
+        checker.keep_route_cache = False
+        command = run_export
+        log = sys.stderr
+    
+    if not args.profile:
+        command(checker, args)
+        checker.subscriptions.flush()
+        return
+    
+    with ProfileSession(args.profile) as profile:
+        checker.timeline = profile.timeline
+        command(checker, args)
+    checker.subscriptions.flush()
+    
+    print("\n" + "=" * 80, file=log)
+    print(f"🔬 PROFILE: {format_summary(profile.summary)}", file=log)
+    print(f"   Trace (chrome://tracing, ui.perfetto.dev): {profile.trace_path}", file=log)
+    print(f"   Flamegraph stacks (flamegraph.pl, speedscope.app): {profile.folded_path}", file=log)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+GoWild Flight Finder - Adaptive Upstream Limiter
+Paces and caps upstream requests from what upstream is actually doing
+
+Replaces fixed sleeps and worker counts with AIMD control of two knobs:
+    limit     how many requests may be in flight at once
+    interval  minimum gap between request starts (jittered ±25%)
+A fast, successful response nudges both towards more throughput (limit
+grows by 1/limit, so about +1 per window of requests; interval shrinks 5%).
+A 429, a 403 (how Frontier's bot protection says the same), a 5xx or a
+network error halves the limit and doubles the interval, and a Retry-After
+header pauses every request for as long as upstream asked. A response much
+slower than the smoothed (EWMA) latency only eases off gently - one slow
+reply among healthy jitter must not look like being throttled. Both knobs
+stay inside the hard bounds the limiter was created with.
+
+Usage:
+    ticket = limiter.acquire()          # waits for a slot and the pacing gap
+    with ticket:
+        response = session.get(url)
+        ticket.record(response)         # no record, or an exception, counts as an error
+    ticket.cancel()                     # or hand back a ticket that never made a request
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+# Responses slower than this multiple of the smoothed latency count as congestion
+LATENCY_TOLERANCE = 2.0
+
+# Statuses that mean "you are sending too much", not "this request was bad"
+THROTTLE_STATUSES = {403, 429}
+
+
+class _Ticket:
+    """One admitted request; reports its outcome to the limiter on exit"""
+
+    def __init__(self, limiter, started):
+        self.limiter = limiter
+        self.started = started
+        self.status = None
+        self.retry_after = None
+
+    def record(self, response):
+        self.status = response.status_code
+        self.retry_after = response.headers.get('Retry-After')
+
+    def cancel(self):
+        self.limiter.cancel(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        error = exc_type is not None or self.status is None
+        self.limiter.release(self, error=error)
+        return False
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit and request pacing within hard bounds"""
+
+    def __init__(self, name, min_limit=1, max_limit=8, initial_limit=2,
+                 min_interval=0.2, max_interval=30.0, initial_interval=1.5, latency_window=100):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.limit = float(initial_limit)
+        self.interval = float(initial_interval)
+
+        self._cond = threading.Condition()
+        self._waiting = deque()  # FIFO of waiters so admission keeps the caller's order
+        self._in_flight = 0
+        self._next_start = 0.0
+        self._last_ticket = None
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._latency_alpha = 2.0 / (latency_window + 1)  # EWMA weight spanning about latency_window responses
+        self._latency = None
+        self._samples = 0
+        self._counts = {'ok': 0, 'slow': 0, 'throttled': 0, 'errors': 0, 'rejected': 0}
+        self._logged = (int(self.limit), self.interval)
+
+    def acquire(self):
+        """Block until a request may start; returns a ticket to use as a context manager"""
+        me = object()
+        with self._cond:
+            self._waiting.append(me)
+            while True:
+                now = time.monotonic()
+                start_at = max(self._next_start, self._paused_until)
+                if self._waiting[0] is me and self._in_flight < int(self.limit) and now >= start_at:
+                    break
+                self._cond.wait(timeout=max(0.0, start_at - now) or None)
+            self._waiting.popleft()
+            self._in_flight += 1
+            self._next_start = now + self.interval * random.uniform(0.75, 1.25)
+            ticket = self._last_ticket = _Ticket(self, now)
+            self._cond.notify_all()
+        return ticket
+
+    def cancel(self, ticket):
+        """Free a ticket's slot without judging upstream by it"""
+        with self._cond:
+            self._in_flight -= 1
+            if self._last_ticket is ticket:
+                # Nothing was sent, so the next request needn't keep a gap from it
+                self._next_start = ticket.started
+            self._cond.notify_all()
+
+    def release(self, ticket, error=False):
+        latency = time.monotonic() - ticket.started
+        with self._cond:
+            self._in_flight -= 1
+            status = ticket.status
+            if error or status in THROTTLE_STATUSES or (status is not None and status >= 500):
+                self._counts['throttled' if status in THROTTLE_STATUSES else 'errors'] += 1
+                reason = f"HTTP {status}" if status is not None else "request failed"
+                self._decrease(ticket, reason)
+                self._pause_for(ticket.retry_after)
+            elif status == 200:
+                baseline = self._latency if self._latency is not None else latency
+                self._latency = baseline + self._latency_alpha * (latency - baseline)
+                self._samples += 1
+                if latency > LATENCY_TOLERANCE * baseline and self._samples > 10:
+                    self._counts['slow'] += 1
+                    self._ease_off(f"latency {latency:.1f}s vs {baseline:.1f}s average")
+                else:
+                    self._counts['ok'] += 1
+                    self._increase()
+            else:
+                # Other 4xx: this request was wrong, upstream isn't overloaded
+                self._counts['rejected'] += 1
+            self._cond.notify_all()
+
+    def _increase(self):
+        self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self.interval = max(self.min_interval, self.interval * 0.95)
+        limit, interval = self._logged
+        if int(self.limit) != limit or self.interval < interval * 0.75:
+            self._log('📈', 'upstream healthy')
+
+    def _ease_off(self, reason):
+        # Latency alone is a soft signal: give back a little, don't back off hard
+        self.limit = max(self.min_limit, self.limit * 0.9)
+        self.interval = min(self.max_interval, self.interval * 1.1)
+        limit, interval = self._logged
+        if int(self.limit) != limit or self.interval > interval * 1.5:
+            self._log('🐢', reason)
+
+    def _decrease(self, ticket, reason):
+        # Requests already in flight when we backed off report the same congestion;
+        # react once per episode, like TCP does per window
+        if ticket.started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.limit = max(self.min_limit, self.limit / 2)
+        self.interval = min(self.max_interval, self.interval * 2)
+        self._log('📉', reason)
+
+    def _pause_for(self, retry_after):
+        try:
+            seconds = float(retry_after)
+        except (TypeError, ValueError):
+            return  # absent, or an HTTP date we don't bother parsing
+        seconds = min(seconds, self.max_interval)
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        print(f"⏸️  {self.name}: upstream asked us to wait {seconds:.0f}s (Retry-After)")
+
+    def _log(self, icon, reason):
+        print(f"{icon} {self.name}: {int(self.limit)} in flight, {self.interval:.2f}s between requests ({reason})")
+        self._logged = (int(self.limit), self.interval)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit': int(self.limit),
+                'interval_s': round(self.interval, 3),
+                'in_flight': self._in_flight,
+                'waiting': len(self._waiting),
+                'paused_for_s': round(max(0.0, self._paused_until - time.monotonic()), 1),
+                'latency_avg_s': round(self._latency, 3) if self._latency is not None else None,
+                'bounds': {'limit': [self.min_limit, self.max_limit],
+                           'interval_s': [self.min_interval, self.max_interval]},
+                'responses': dict(self._counts),
+            }
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+GoWild Flight Finder - Profiling
+Per-route timelines and stack sampling for slow discovery runs
+
+A profiled run writes two files:
+    <name>.json    Chrome trace events - open in chrome://tracing or ui.perfetto.dev
+    <name>.folded  folded stacks - feed to flamegraph.pl or drop into speedscope.app
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+# Timeline categories and what they mean for a slow run
+CATEGORY_LABELS = {
+    'fetch': 'upstream latency',
+    'parse': 'local parsing',
+    'sleep': 'sleep policy',
+}
+
+
+class RouteTimeline:
+    """Thread-safe collector of timed spans for one run"""
+
+    def __init__(self):
+        self.events = []
+        self.thread_ids = set()
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """Time a block; the yielded dict can be filled with extra args"""
+        tid = threading.get_ident()
+        with self._lock:
+            self.thread_ids.add(tid)
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': round((start - self._t0) * 1e6),
+                'dur': round((end - start) * 1e6),
+                'pid': os.getpid(),
+                'tid': tid,
+                'args': args,
+            }
+            with self._lock:
+                self.events.append(event)
+
+    def totals(self):
+        """Milliseconds spent per category, summed across threads"""
+        totals = Counter()
+        with self._lock:
+            for event in self.events:
+                totals[event['cat']] += event['dur'] / 1000
+        return totals
+
+    def summary(self):
+        """Time per category plus which one dominated the run"""
+        totals = self.totals()
+        accounted = {category: round(totals.get(category, 0), 1) for category in CATEGORY_LABELS}
+        spent = sum(accounted.values())
+        bottleneck = max(accounted, key=accounted.get) if spent else None
+        with self._lock:
+            routes = [event for event in self.events if event['cat'] == 'route']
+        return {
+            'ms': accounted,
+            'routes': len(routes),
+            'cached_routes': sum(1 for event in routes if event['args'].get('cached')),
+            'bytes_received': sum(event['args'].get('bytes', 0) for event in routes),
+            'flights_found': sum(event['args'].get('flights', 0) for event in routes),
+            'bottleneck': CATEGORY_LABELS.get(bottleneck),
+        }
+
+
+def span(timeline, name, category, **args):
+    """timeline.span(...) when profiling, a no-op context otherwise"""
+    if timeline is None:
+        return nullcontext(args)
+    return timeline.span(name, category, **args)
+
+
+class StackSampler:
+    """Samples Python stacks of selected threads at a fixed interval"""
+
+    def __init__(self, interval=0.005, thread_ids=None):
+        self.interval = interval
+        self.thread_ids = thread_ids  # None samples every thread; a live set is re-read each tick
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me or (self.thread_ids is not None and tid not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if tid not in names:
+                    names[tid] = next((t.name for t in threading.enumerate() if t.ident == tid), str(tid))
+                stack.append(names[tid])
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def write_folded(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileSession:
+    """Profile a block of work and write trace + flamegraph files
+
+    Usage:
+        with ProfileSession('discovery') as profile:
+            run(timeline=profile.timeline)
+        print(profile.summary)
+    """
+
+    def __init__(self, base_path, only_timeline_threads=False, interval=0.005):
+        self.base_path = base_path[:-5] if base_path.endswith('.json') else base_path
+        self.trace_path = f"{self.base_path}.json"
+        self.folded_path = f"{self.base_path}.folded"
+        self.timeline = RouteTimeline()
+        # Web requests share the process with other users, so only sample threads
+        # that actually ran this request's work
+        thread_ids = self.timeline.thread_ids if only_timeline_threads else None
+        self.sampler = StackSampler(interval, thread_ids)
+        self.summary = None
+
+    def __enter__(self):
+        self.sampler.start()
+        self._run_span = self.timeline.span('run', 'run')
+        self._run_span.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._run_span.__exit__(exc_type, exc, tb)
+        self.sampler.stop()
+        self.summary = self.timeline.summary()
+        self.write()
+        return False
+
+    def write(self):
+        directory = os.path.dirname(self.trace_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        metadata = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+             'args': {'name': thread_names.get(tid, str(tid))}}
+            for tid in self.timeline.thread_ids
+        ]
+        with open(self.trace_path, 'w') as f:
+            json.dump({
+                'traceEvents': metadata + self.timeline.events,
+                'displayTimeUnit': 'ms',
+                'otherData': {'summary': self.summary},
+            }, f)
+        self.sampler.write_folded(self.folded_path)
+
+
+def format_summary(summary):
+    """One-line human readable verdict for a profile summary"""
+    ms = summary['ms']
+    spent = sum(ms.values()) or 1
+    parts = ' | '.join(f"{CATEGORY_LABELS[category]} {ms[category] / 1000:.1f}s ({ms[category] / spent:.0%})"
+                       for category in CATEGORY_LABELS)
+    if summary['bottleneck']:
+        verdict = summary['bottleneck']
+    elif summary['routes'] and summary['cached_routes'] == summary['routes']:
+        verdict = 'nothing - every route was cached'
+    else:
+        verdict = 'nothing measured'
+    return (f"{summary['routes']} routes ({summary['cached_routes']} cached), {summary['bytes_received']:,} bytes, "
+            f"{summary['flights_found']} flights | {parts} → limited by {verdict}")
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+GoWild Flight Finder - Incremental Rollups
+Discovery summaries kept up to date as each route is fetched
+
+Every observed route updates two rollups: the origin's outbound view and
+the destination's inbound view for that date. A rollup stores each route's
+contribution (cheapest fare, flights and seats per price tier, counts by
+stops) next to the running totals, so re-fetching a route swaps its old
+contribution for the new one in time proportional to that route's flights.
+Reading a summary never re-scans raw flight lists. With a ttl, contributions
+older than it drop out, matching how long the route cache trusts an answer.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+
+# (upper bound exclusive, label); None is open-ended
+PRICE_TIERS = [
+    (25, 'under $25'),
+    (50, '$25-$50'),
+    (100, '$50-$100'),
+    (None, '$100+'),
+]
+
+
+def price_tier(price):
+    for bound, label in PRICE_TIERS:
+        if bound is None or price < bound:
+            return label
+
+
+def stop_count(flight):
+    """Number of stops, from layovers when present, else the stops text"""
+    if flight.get('layovers') is not None:
+        return len(flight['layovers'])
+    digits = re.search(r'\d+', str(flight.get('stops', '')))
+    return int(digits.group()) if digits else 0
+
+
+def _route_contribution(flights, observed_at):
+    """What one route adds to a rollup"""
+    tiers = {}
+    stops = Counter()
+    cheapest = None
+    for flight in flights:
+        price = float(flight.get('price') or 0)
+        tier = tiers.setdefault(price_tier(price), [0, 0, 0])  # flights, seats, flights with open seating
+        tier[0] += 1
+        if flight.get('seats') is None:
+            # Frontier leaves the count out when plenty remain
+            tier[2] += 1
+        else:
+            tier[1] += flight['seats']
+        stops[stop_count(flight)] += 1
+        if cheapest is None or price < cheapest['price']:
+            cheapest = {
+                'price': price,
+                'flight_number': flight.get('flight_number'),
+                'departure_time': flight.get('departure_time'),
+                'stops': stop_count(flight),
+                'seats': flight.get('seats'),
+            }
+    return {'flights': len(flights), 'cheapest': cheapest, 'tiers': tiers, 'stops': stops,
+            'observed_at': observed_at}
+
+
+class _Rollup:
+    """Running aggregates for one (direction, airport, date)"""
+
+    def __init__(self):
+        self.routes = {}  # other airport -> its contribution
+        self.flights = 0
+        self.tiers = {label: {'flights': 0, 'seats': 0, 'open_flights': 0, 'airports': Counter()}
+                      for _, label in PRICE_TIERS}
+        self.stops = Counter()
+        self.updated = None
+
+    def _apply(self, other, contribution, sign):
+        self.flights += sign * contribution['flights']
+        for label, (flights, seats, open_flights) in contribution['tiers'].items():
+            tier = self.tiers[label]
+            tier['flights'] += sign * flights
+            tier['seats'] += sign * seats
+            tier['open_flights'] += sign * open_flights
+            tier['airports'][other] += sign * flights
+            if tier['airports'][other] <= 0:
+                del tier['airports'][other]
+        for stops, count in contribution['stops'].items():
+            self.stops[stops] += sign * count
+            if self.stops[stops] <= 0:
+                del self.stops[stops]
+
+    def is_current(self, other, observed_at):
+        contribution = self.routes.get(other)
+        return contribution is not None and contribution['observed_at'] >= observed_at
+
+    def expire(self, cutoff):
+        for other, contribution in list(self.routes.items()):
+            if contribution['observed_at'] < cutoff:
+                self._apply(other, contribution, -1)
+                del self.routes[other]
+
+    def replace(self, other, contribution):
+        previous = self.routes.pop(other, None)
+        if previous is not None:
+            self._apply(other, previous, -1)
+        self.routes[other] = contribution
+        self._apply(other, contribution, 1)
+        self.updated = time.time()
+
+
+class RouteRollups:
+    """Thread-safe rollups fed one route observation at a time"""
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl  # seconds a route's contribution counts, None for forever
+        self._rollups = {}  # (direction, airport, date_str) -> _Rollup
+        self._lock = threading.Lock()
+
+    def _sides(self, origin, destination, date_str):
+        """(rollup key, other airport) for both views of one route"""
+        return ((('outbound', origin, date_str), destination), (('inbound', destination, date_str), origin))
+
+    def observe(self, origin, destination, date_str, flights, observed_at=None):
+        """Fold a route's flights into its outbound and inbound rollups
+
+        observed_at is when the flights were fetched (default: now). Cached
+        answers can be replayed cheaply - a route already counted with data
+        at least that new is skipped.
+        """
+        observed_at = observed_at or time.time()
+        with self._lock:
+            if all(key in self._rollups and self._rollups[key].is_current(other, observed_at)
+                   for key, other in self._sides(origin, destination, date_str)):
+                return
+
+        contribution = _route_contribution(flights, observed_at)
+        with self._lock:
+            for key, other in self._sides(origin, destination, date_str):
+                rollup = self._rollups.get(key)
+                if rollup is None:
+                    rollup = self._rollups[key] = _Rollup()
+                if not rollup.is_current(other, observed_at):
+                    rollup.replace(other, contribution)
+
+    def _expire(self, key):
+        """Drop stale route contributions from one rollup (caller holds lock)"""
+        rollup = self._rollups.get(key)
+        if rollup is not None and self.ttl is not None:
+            rollup.expire(time.time() - self.ttl)
+            if not rollup.routes:
+                del self._rollups[key]
+                return None
+        return rollup
+
+    def available(self):
+        """(direction, airport, date) of every rollup with at least one current route"""
+        with self._lock:
+            return sorted(key for key in list(self._rollups) if self._expire(key) is not None)
+
+    def summary(self, direction, airport, date_str):
+        """Snapshot of one rollup as plain data, or None if nothing was observed"""
+        with self._lock:
+            rollup = self._expire((direction, airport, date_str))
+            if rollup is None:
+                return None
+            cheapest = sorted(
+                (dict(contribution['cheapest'], airport=other)
+                 for other, contribution in rollup.routes.items() if contribution['cheapest']),
+                key=lambda entry: (entry['price'], entry['airport'])
+            )
+            tiers = [
+                {
+                    'tier': label,
+                    'flights': rollup.tiers[label]['flights'],
+                    'seats': rollup.tiers[label]['seats'],
+                    'open_flights': rollup.tiers[label]['open_flights'],
+                    'airports': sorted(rollup.tiers[label]['airports']),
+                }
+                for _, label in PRICE_TIERS
+            ]
+            return {
+                'direction': direction,
+                'airport': airport,
+                'date': date_str,
+                'updated': rollup.updated,
+                'routes_checked': len(rollup.routes),
+                'routes_with_flights': len(cheapest),
+                'flights': rollup.flights,
+                'cheapest': cheapest,
+                'tiers': tiers,
+                'stops': {str(stops): count for stops, count in sorted(rollup.stops.items())},
+            }
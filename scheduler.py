@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+GoWild Flight Finder - Fair Upstream Scheduling
+Shares the upstream worker pool fairly between concurrent users
+
+Every upstream fetch is a task owned by a client and a traffic class.
+Each (client, class) pair is a flow, and flows are served by self-clocked
+weighted fair queuing: a task's finish tag is
+    max(virtual time, flow's previous finish tag) + 1 / class weight
+and idle workers always take the eligible task with the smallest tag.
+Interactive searches carry a higher weight than bulk discovery, so a
+one-route lookup overtakes a queued all-domestic crawl, while per-client
+quotas stop any one client from flooding the queue or, while others are
+waiting, from holding every worker. A client alone gets the whole pool.
+
+With a limiter, a worker takes a limiter ticket (slot and pacing gap)
+before it pops a task, and the task runs with ticket=<that ticket>. Which
+task goes next is decided only once upstream may be called, so an
+interactive task submitted during a long bulk run is next in line rather
+than queued behind bulk tasks already waiting inside the limiter.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+
+# Relative share of workers when both classes are backlogged
+CLASS_WEIGHTS = {
+    'interactive': 8,
+    'bulk': 1,
+}
+
+
+class QuotaExceeded(Exception):
+    """Raised when a client already has too much work queued"""
+
+
+class _Task:
+    __slots__ = ('finish', 'seq', 'client', 'traffic_class', 'fn', 'args', 'future', 'enqueued_at')
+
+    def __init__(self, finish, seq, client, traffic_class, fn, args, future):
+        self.finish = finish
+        self.seq = seq
+        self.client = client
+        self.traffic_class = traffic_class
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.finish, self.seq) < (other.finish, other.seq)
+
+
+class FairScheduler:
+    """Fixed worker pool fed by weighted fair queues with per-client quotas"""
+
+    def __init__(self, workers=5, max_in_flight_per_client=3, max_queued_per_client=100, stats_window=1000,
+                 limiter=None):
+        self.workers = workers
+        self.limiter = limiter  # AdaptiveLimiter that paces dispatch, or None
+        self.max_in_flight_per_client = max_in_flight_per_client
+        self.max_queued_per_client = max_queued_per_client
+
+        self._cond = threading.Condition()
+        self._ready = []  # heap of _Task ordered by finish tag
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish = {}  # (client, class) -> finish tag of its newest task
+        self._queued = defaultdict(int)
+        self._in_flight = defaultdict(int)
+        self._busy = 0
+        self._admitting = 0  # workers waiting on the limiter for a task to run
+        self._waits = {traffic_class: deque(maxlen=stats_window) for traffic_class in CLASS_WEIGHTS}
+        self._completed = defaultdict(int)
+        self._threads = []
+
+    def _ensure_workers(self):
+        # Started lazily so importing the app doesn't spawn threads
+        if not self._threads:
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"upstream-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit_batch(self, client, traffic_class, calls):
+        """Queue [(fn, args), ...] for a client; returns one Future per call
+
+        The whole batch is admitted or rejected at once, so a search never
+        ends up half queued.
+        """
+        weight = CLASS_WEIGHTS[traffic_class]
+        futures = []
+        with self._cond:
+            if self._queued[client] + len(calls) > self.max_queued_per_client:
+                raise QuotaExceeded(
+                    f"Too many searches in progress ({self._queued[client]} queued upstream checks) - "
+                    f"please wait for them to finish"
+                )
+            self._ensure_workers()
+            flow = (client, traffic_class)
+            for fn, args in calls:
+                start = max(self._virtual_time, self._last_finish.get(flow, 0.0))
+                finish = start + 1.0 / weight
+                self._last_finish[flow] = finish
+                future = Future()
+                heapq.heappush(self._ready, _Task(finish, next(self._seq), client, traffic_class, fn, args, future))
+                self._queued[client] += 1
+                futures.append(future)
+            self._cond.notify_all()
+        return futures
+
+    def submit(self, client, traffic_class, fn, *args):
+        return self.submit_batch(client, traffic_class, [(fn, args)])[0]
+
+    def _others_waiting(self, client):
+        return any(count for other, count in self._queued.items() if other != client)
+
+    def _next_task(self):
+        """Pop the smallest-tag task whose client may start another fetch (caller holds lock)
+        
+        The in-flight cap only applies while some other client has work queued;
+        otherwise idle workers would sit unused.
+        """
+        skipped = []
+        task = None
+        while self._ready:
+            candidate = heapq.heappop(self._ready)
+            if (self._in_flight[candidate.client] < self.max_in_flight_per_client
+                    or not self._others_waiting(candidate.client)):
+                task = candidate
+                break
+            skipped.append(candidate)
+        for candidate in skipped:
+            heapq.heappush(self._ready, candidate)
+        return task
+
+    def _has_task(self):
+        task = self._next_task()
+        if task is not None:
+            heapq.heappush(self._ready, task)
+        return task is not None
+
+    def _worker(self):
+        while True:
+            ticket = None
+            if self.limiter is not None:
+                with self._cond:
+                    # No more workers at the limiter than there are tasks to run
+                    while self._admitting >= len(self._ready) or not self._has_task():
+                        self._cond.wait()
+                    self._admitting += 1
+                ticket = self.limiter.acquire()
+            
+            with self._cond:
+                if ticket is not None:
+                    self._admitting -= 1
+                task = self._next_task()
+                if ticket is not None and task is None:
+                    # Another worker took the last task while we waited for upstream
+                    ticket.cancel()
+                    continue
+                while task is None:
+                    self._cond.wait()
+                    task = self._next_task()
+                self._virtual_time = task.finish
+                self._queued[task.client] -= 1
+                self._in_flight[task.client] += 1
+                self._busy += 1
+                self._waits[task.traffic_class].append(time.monotonic() - task.enqueued_at)
+
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    if ticket is None:
+                        task.future.set_result(task.fn(*task.args))
+                    else:
+                        task.future.set_result(task.fn(*task.args, ticket=ticket))
+                except BaseException as e:
+                    task.future.set_exception(e)
+
+            with self._cond:
+                self._in_flight[task.client] -= 1
+                self._busy -= 1
+                self._completed[task.traffic_class] += 1
+                if not self._queued[task.client] and not self._in_flight[task.client]:
+                    del self._queued[task.client]
+                    del self._in_flight[task.client]
+                    for traffic_class in CLASS_WEIGHTS:
+                        self._last_finish.pop((task.client, traffic_class), None)
+                # A slot under this client's cap may have opened up
+                self._cond.notify_all()
+
+    def stats(self):
+        """Queue depth, per-client load and recent wait times per class"""
+        with self._cond:
+            depth = defaultdict(int)
+            for task in self._ready:
+                depth[task.traffic_class] += 1
+            classes = {}
+            for traffic_class, waits in self._waits.items():
+                ordered = sorted(waits)
+                classes[traffic_class] = {
+                    'weight': CLASS_WEIGHTS[traffic_class],
+                    'queued': depth[traffic_class],
+                    'completed': self._completed[traffic_class],
+                    'wait_ms_p50': round(ordered[len(ordered) // 2] * 1000, 1) if ordered else 0,
+                    'wait_ms_p99': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 1) if ordered else 0,
+                    'wait_ms_max': round(ordered[-1] * 1000, 1) if ordered else 0,
+                }
+            clients = {
+                client: {'queued': self._queued[client], 'in_flight': self._in_flight[client]}
+                for client in set(self._queued) | set(self._in_flight)
+            }
+            return {
+                'workers': self.workers,
+                'busy': self._busy,
+                'queued': len(self._ready),
+                'max_in_flight_per_client': self.max_in_flight_per_client,
+                'max_queued_per_client': self.max_queued_per_client,
+                'classes': classes,
+                'clients': clients,
+            }
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+GoWild Flight Finder - Warm-Start Snapshots
+Persists cached knowledge to disk so a restarted app serves immediately
+"""
+
+import json
+import mmap
+import os
+
+SNAPSHOT_VERSION = 1
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file
+
+    File layout:
+        line 1  JSON header {"version", "created", "index": {section: {key: [offset, length(, stamp)]}}}
+        rest    concatenated JSON records, offsets relative to the end of the header line
+
+    Only the header is parsed on open. Records are decoded on first lookup, so
+    opening a large snapshot costs about the same as opening a small one. The
+    optional stamp (e.g. when a record was fetched) is readable without
+    decoding the record at all.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.created = None
+        self._index = {}
+        self._mm = None
+        self._body_start = 0
+        self._open()
+
+    def _open(self):
+        try:
+            with open(self.path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return
+
+        try:
+            header_line = self._mm.readline()
+            header = json.loads(header_line)
+            if header.get('version') != SNAPSHOT_VERSION:
+                raise ValueError(f"unsupported snapshot version {header.get('version')}")
+        except ValueError as e:
+            print(f"⚠️  Ignoring unreadable snapshot {self.path}: {e}")
+            self._mm.close()
+            self._mm = None
+            return
+
+        self.created = header.get('created')
+        self._index = header.get('index', {})
+        self._body_start = len(header_line)
+
+    def __len__(self):
+        return sum(len(keys) for keys in self._index.values())
+
+    def keys(self, section):
+        return self._index.get(section, {}).keys()
+
+    def raw(self, section, key):
+        """Return the undecoded JSON bytes for a record, or None"""
+        location = self._index.get(section, {}).get(key)
+        if location is None or self._mm is None:
+            return None
+        offset, length = location[:2]
+        start = self._body_start + offset
+        return self._mm[start:start + length]
+
+    def stamp(self, section, key):
+        """Return the number stored with a record in the index, or None"""
+        location = self._index.get(section, {}).get(key)
+        return location[2] if location is not None and len(location) > 2 else None
+
+    def get(self, section, key):
+        """Decode and return a single record, or None"""
+        raw = self.raw(section, key)
+        return json.loads(raw) if raw is not None else None
+
+
+def write_snapshot(path, sections, created, stamps=None):
+    """Atomically write a snapshot file
+
+    sections maps section name -> {key: record}. A record may be any JSON
+    value, or bytes already holding encoded JSON (e.g. copied from a
+    previous Snapshot.raw) which are written through untouched. stamps maps
+    section name -> {key: number} kept in the header index next to a record.
+    """
+    stamps = stamps or {}
+    index = {}
+    chunks = []
+    offset = 0
+    for section, records in sections.items():
+        section_index = index.setdefault(section, {})
+        section_stamps = stamps.get(section, {})
+        for key, record in records.items():
+            data = record if isinstance(record, bytes) else json.dumps(record, separators=(',', ':')).encode('utf-8')
+            section_index[key] = [offset, len(data)]
+            if key in section_stamps:
+                section_index[key].append(section_stamps[key])
+            chunks.append(data)
+            offset += len(data)
+
+    header = json.dumps({'version': SNAPSHOT_VERSION, 'created': created, 'index': index},
+                        separators=(',', ':')).encode('utf-8') + b'\n'
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -9,30 +9,32 @@ import sys
 import webbrowser
 import time
 import threading
-import socket
+import urllib.request
 
-def is_port_open(port):
-    """Check if a port is already in use"""
+HEALTHZ_URL = 'http://localhost:8000/healthz'
+
+def is_ready():
+    """Check the app's readiness endpoint"""
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        result = sock.connect_ex(('localhost', port))
-        sock.close()
-        return result == 0
-    except:
+        with urllib.request.urlopen(HEALTHZ_URL, timeout=1) as response:
+            return response.status == 200
+    except OSError:
         return False
 
 def open_browser_when_ready():
-    """Wait for server to start, then open browser"""
+    """Wait for server to report ready, then open browser"""
     print("🌐 Waiting for server to start...")
     
-    # Wait up to 10 seconds for server to be ready
-    for i in range(20):
-        if is_port_open(8000):
+    # Wait up to 10 seconds, checking quickly at first and backing off
+    deadline = time.monotonic() + 10
+    delay = 0.05
+    while time.monotonic() < deadline:
+        if is_ready():
             print("✅ Server is ready! Opening browser...")
             webbrowser.open('http://localhost:8000')
             return
-        time.sleep(0.5)
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
     
     print("⚠️  Server took too long to start. Please open http://localhost:8000 manually.")
 
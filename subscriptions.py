@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+GoWild Flight Finder - Saved Search Subscriptions
+Matches every parsed flight against saved searches as it arrives
+
+Subscriptions are expanded into an inverted index keyed by
+(origin, destination, date), so matching a freshly parsed route is a single
+dict lookup no matter how many subscriptions exist; only the handful filed
+under that exact key have their filters evaluated. Matches land in an
+in-app feed and, optionally, are POSTed to a local webhook.
+
+The web app, CLI runs and crawl workers all match the same saved searches.
+Each webhook delivery is claimed in a small SQLite file next to the
+subscriptions file first, so a flight is POSTed once no matter how many
+processes see it.
+"""
+
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+from rollups import stop_count
+
+# Webhooks may only point at this machine
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1'}
+
+# Shared by the web app, the CLI and crawl workers
+DEFAULT_PATH = os.environ.get('GOWILD_SUBSCRIPTIONS_PATH',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'subscriptions.json'))
+
+
+def _minutes(time_str):
+    """'7:32 PM' -> minutes since midnight, or None"""
+    match = re.match(r'(\d{1,2}):(\d{2})\s*(AM|PM)?', (time_str or '').strip(), re.IGNORECASE)
+    if not match:
+        return None
+    hour, minute, ampm = int(match.group(1)), int(match.group(2)), (match.group(3) or '').upper()
+    if ampm == 'PM' and hour != 12:
+        hour += 12
+    elif ampm == 'AM' and hour == 12:
+        hour = 0
+    return hour * 60 + minute
+
+
+def _flight_key(flight):
+    return '|'.join(str(flight.get(field, '')) for field in
+                    ('flight_number', 'departure_airport', 'arrival_airport', 'departure_time', 'price'))
+
+
+def delivered_path(path):
+    """SQLite file recording which webhook matches were already sent"""
+    return f"{os.path.splitext(path)[0]}-delivered.db"
+
+
+def _airports(data, field):
+    codes = data.get(field)
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        raise ValueError(f"{field} must be a list of airport codes")
+    codes = sorted({code.strip().upper() for code in codes if code.strip()})
+    if not codes:
+        raise ValueError("origins and destinations must each list at least one airport")
+    return codes
+
+
+def _optional_int(data, field):
+    value = data.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{field} must be a whole number")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{field} must be a whole number")
+
+
+def validate_subscription(data):
+    """Normalize a subscription request body; raises ValueError on bad input"""
+    if not isinstance(data, dict):
+        raise ValueError("subscription must be a JSON object")
+    origins = _airports(data, 'origins')
+    destinations = _airports(data, 'destinations')
+    if not isinstance(data.get('date'), str):
+        raise ValueError("date must be given as YYYY-MM-DD")
+    date = datetime.strptime(data['date'], '%Y-%m-%d').strftime('%Y-%m-%d')
+
+    depart_after = data.get('depart_after')
+    depart_before = data.get('depart_before')
+    for value in (depart_after, depart_before):
+        if value is not None and (not isinstance(value, str) or _minutes(value) is None):
+            raise ValueError(f"invalid departure time {value!r} (use e.g. '6:00 AM' or '18:30')")
+
+    webhook_url = data.get('webhook_url') or None
+    if webhook_url is not None and not isinstance(webhook_url, str):
+        raise ValueError("webhook_url must be a URL")
+    if webhook_url and urlparse(webhook_url).hostname not in LOCAL_HOSTS:
+        raise ValueError("webhook_url must point at localhost")
+
+    return {
+        'origins': origins,
+        'destinations': destinations,
+        'date': date,
+        'max_stops': _optional_int(data, 'max_stops'),
+        'depart_after': depart_after,
+        'depart_before': depart_before,
+        'min_seats': _optional_int(data, 'min_seats'),
+        'webhook_url': webhook_url,
+    }
+
+
+class SubscriptionStore:
+    """Saved subscriptions, their inverted index and the match feed"""
+
+    def __init__(self, path=None, feed_size=1000):
+        self.path = path
+        self.subscriptions = {}
+        self._index = {}  # (origin, destination, date) -> set of subscription ids
+        self._delivered = {}  # subscription id -> set of flight keys already matched
+        self._feed = deque(maxlen=feed_size)
+        self._feed_seq = 0
+        self._lock = threading.Lock()
+        self._webhooks = queue.Queue()
+        self._webhook_thread = None
+        self._loaded_mtime = None
+        self._sent = None  # webhook deliveries shared with other processes
+        if path:
+            self._sent = sqlite3.connect(delivered_path(path), timeout=30, isolation_level=None,
+                                         check_same_thread=False)
+            self._sent.execute(
+                'CREATE TABLE IF NOT EXISTS sent (subscription_id TEXT NOT NULL, flight_key TEXT NOT NULL, '
+                'sent_at REAL NOT NULL, PRIMARY KEY (subscription_id, flight_key))'
+            )
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not load subscriptions from {self.path}: {e}")
+            return
+        self._loaded_mtime = mtime
+        for subscription in saved:
+            self._add(subscription)
+
+    def refresh(self):
+        """Pick up subscriptions another process saved since we loaded the file
+        
+        For long-running CLI and crawl workers; already delivered matches are
+        remembered for subscriptions that still exist.
+        """
+        if not self.path:
+            return
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        with self._lock:
+            delivered = self._delivered
+            self.subscriptions = {}
+            self._index = {}
+            self._delivered = {}
+            self._load()
+            for subscription_id in self.subscriptions:
+                self._delivered[subscription_id] = delivered.get(subscription_id, set())
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(list(self.subscriptions.values()), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _route_keys(self, subscription):
+        return [(origin, destination, subscription['date'])
+                for origin in subscription['origins'] for destination in subscription['destinations']
+                if origin != destination]
+
+    def _add(self, subscription):
+        self.subscriptions[subscription['id']] = subscription
+        self._delivered[subscription['id']] = set()
+        for key in self._route_keys(subscription):
+            self._index.setdefault(key, set()).add(subscription['id'])
+
+    def create(self, data, known_flights=None):
+        """Save a subscription and match it against what is already known
+        
+        known_flights(origin, destination, date_str) returns flights already
+        fetched for a route (e.g. from a cache) or None, so a new subscription
+        doesn't have to wait for the next upstream fetch of its routes.
+        """
+        subscription = validate_subscription(data)
+        subscription['id'] = uuid.uuid4().hex[:12]
+        subscription['created'] = time.time()
+        with self._lock:
+            self._add(subscription)
+            self._save()
+            self._loaded_mtime = os.path.getmtime(self.path) if self.path else None
+        
+        if known_flights is not None:
+            for origin, destination, date_str in self._route_keys(subscription):
+                flights = known_flights(origin, destination, date_str)
+                if flights:
+                    self._match([subscription['id']], origin, destination, date_str, flights)
+        return subscription
+
+    def delete(self, subscription_id):
+        with self._lock:
+            subscription = self.subscriptions.pop(subscription_id, None)
+            if subscription is None:
+                return False
+            self._delivered.pop(subscription_id, None)
+            if self._sent is not None:
+                self._sent.execute('DELETE FROM sent WHERE subscription_id = ?', (subscription_id,))
+            for origin in subscription['origins']:
+                for destination in subscription['destinations']:
+                    key = (origin, destination, subscription['date'])
+                    ids = self._index.get(key)
+                    if ids:
+                        ids.discard(subscription_id)
+                        if not ids:
+                            del self._index[key]
+            self._save()
+            self._loaded_mtime = os.path.getmtime(self.path) if self.path else None
+            return True
+
+    def _accepts(self, subscription, flight):
+        if subscription['max_stops'] is not None and stop_count(flight) > subscription['max_stops']:
+            return False
+        if subscription['min_seats'] is not None:
+            seats = flight.get('seats')
+            # Frontier leaves the count out when plenty remain
+            if seats is not None and seats < subscription['min_seats']:
+                return False
+        if subscription['depart_after'] or subscription['depart_before']:
+            departs = _minutes(flight.get('departure_time'))
+            if departs is None:
+                return False
+            if subscription['depart_after'] and departs < _minutes(subscription['depart_after']):
+                return False
+            if subscription['depart_before'] and departs > _minutes(subscription['depart_before']):
+                return False
+        return True
+
+    def observe(self, origin, destination, date_str, flights):
+        """Match one parsed route against the index - call for every fetch"""
+        key = (origin, destination, date_str)
+        # Lock-free fast path for the common case of nobody watching this route
+        if not flights or key not in self._index:
+            return []
+        return self._match(None, origin, destination, date_str, flights)
+
+    def _match(self, subscription_ids, origin, destination, date_str, flights):
+        """Match flights for one route against the given subscriptions (None: all indexed)"""
+        matches = []
+        webhooks = []
+        with self._lock:
+            if subscription_ids is None:
+                subscription_ids = list(self._index.get((origin, destination, date_str), ()))
+            for subscription_id in subscription_ids:
+                subscription = self.subscriptions.get(subscription_id)
+                if subscription is None:
+                    continue
+                delivered = self._delivered[subscription_id]
+                for flight in flights:
+                    flight_key = _flight_key(flight)
+                    if flight_key in delivered or not self._accepts(subscription, flight):
+                        continue
+                    delivered.add(flight_key)
+                    self._feed_seq += 1
+                    match = {
+                        'seq': self._feed_seq,
+                        'subscription_id': subscription_id,
+                        'matched_at': time.time(),
+                        'origin': origin,
+                        'destination': destination,
+                        'date': date_str,
+                        'flight': flight,
+                    }
+                    self._feed.append(match)
+                    matches.append((subscription, match))
+                    if subscription['webhook_url'] and self._claim_webhook(subscription_id, flight_key):
+                        webhooks.append((subscription['webhook_url'], match))
+
+        for url, match in webhooks:
+            self._queue_webhook(url, match)
+        return [match for _, match in matches]
+
+    def _claim_webhook(self, subscription_id, flight_key):
+        """True if no process has sent this match yet (caller holds lock)"""
+        if self._sent is None:
+            return True
+        cursor = self._sent.execute(
+            'INSERT OR IGNORE INTO sent (subscription_id, flight_key, sent_at) VALUES (?, ?, ?)',
+            (subscription_id, flight_key, time.time())
+        )
+        return bool(cursor.rowcount)
+
+    def feed(self, since=0, subscription_id=None):
+        with self._lock:
+            return [match for match in self._feed
+                    if match['seq'] > since and (subscription_id is None or match['subscription_id'] == subscription_id)]
+
+    def _queue_webhook(self, url, match):
+        # Delivered from one background thread so fetch workers never wait on a webhook
+        with self._lock:
+            if self._webhook_thread is None:
+                self._webhook_thread = threading.Thread(target=self._deliver_webhooks, daemon=True)
+                self._webhook_thread.start()
+        self._webhooks.put((url, match))
+
+    def _deliver_webhooks(self):
+        session = requests.Session()
+        while True:
+            url, match = self._webhooks.get()
+            try:
+                session.post(url, json=match, timeout=5)
+            except requests.RequestException as e:
+                print(f"⚠️  Webhook {url} failed: {e}")
+            finally:
+                self._webhooks.task_done()
+
+    def flush(self):
+        """Wait for queued webhooks - short-lived processes call this before exiting"""
+        if self._webhook_thread is not None:
+            self._webhooks.join()